@@ -3,6 +3,8 @@ Telegram bot for controlling the monitoring system
 Allows management of channels, keywords, and statistics
 """
 import asyncio
+import time
+from typing import Optional, Tuple
 from pyrogram import Client, filters
 from pyrogram.types import (
     Message, 
@@ -14,147 +16,275 @@ from pyrogram.handlers import MessageHandler, CallbackQueryHandler
 
 from config import config
 from database import db
+from exporter import DataExporter
 from logger import monitor_logger
 
 
+# ================== Static Replies ==================
+# Built once at import since they never depend on runtime state
+
+# Indexed by is_active: inactive, active
+STATUS_ICONS = ("🔴", "🟢")
+
+WELCOME_TEXT = (
+    "🤖 **Welcome to Channel Monitor Bot!**\n\n"
+    "Use the buttons below or type /help to see available commands."
+)
+
+HELP_TEXT = """
+📚 **Available Commands:**
+
+**Basic Commands:**
+• /start - Main menu
+• /help - Show help
+• /status - System status
+
+**Channel Management:**
+• /channels - Show monitored channels
+• /addchannel @username - Add channel
+• /removechannel @username - Remove channel
+
+**Keyword Management:**
+• /keywords - Show keywords
+• /addkeyword word - Add keyword
+• /removekeyword word - Remove keyword
+
+**Statistics:**
+• /stats - General statistics
+• /recent - Recently detected messages
+• /export - Export data
+"""
+
+MAIN_MENU_KEYBOARD = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("📢 Channels", callback_data="menu_channels"),
+        InlineKeyboardButton("🔑 Keywords", callback_data="menu_keywords")
+    ],
+    [
+        InlineKeyboardButton("📊 Statistics", callback_data="menu_stats"),
+        InlineKeyboardButton("📋 Recent Messages", callback_data="menu_recent")
+    ],
+    [
+        InlineKeyboardButton("ℹ️ Help", callback_data="menu_help")
+    ]
+])
+
+ADD_CHANNEL_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("➕ Add Channel", callback_data="add_channel")]
+])
+
+ADD_KEYWORD_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("➕ Add Keyword", callback_data="add_keyword")]
+])
+
+EXPORT_KEYBOARD = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("📊 CSV", callback_data="export_csv"),
+        InlineKeyboardButton("📋 JSON", callback_data="export_json")
+    ]
+])
+
+
 class MonitorBot:
     """Bot for controlling the monitoring system"""
     
+    # Replies with more rows than this are formatted in a worker thread
+    FORMAT_IN_THREAD_ROWS = 200
+    
     def __init__(self, client: Client):
         self.client = client
         self.admin_id = config.NOTIFY_USER_ID
+        self.admin_ids = frozenset({self.admin_id})
+        # Built once and shared by every admin-only handler
+        self._admin_filter = filters.user(list(self.admin_ids))
         self.monitor_instance = None  # Will be set later
+        self._cache_ttl = 30  # Seconds before cached lists are refetched
+        self._channels_cache = None  # (active channels, fetched_at)
+        self._keywords_cache = None  # (active keywords, fetched_at)
+        self._channels_by_key = {}  # username / channel_id -> channel (incl. inactive)
+        self._keywords_by_text = {}  # keyword -> keyword row (incl. inactive)
+        self._background_tasks = set()  # Keep references so tasks aren't collected
+        self._buckets = {}  # (action, user_id) -> (last_refill, tokens)
+        self.command_timings = {}  # command -> (calls, total_seconds)
+        
+        # Callback data -> handler, resolved once
+        self._menu_routes = {
+            "menu_channels": self._render_channels,
+            "menu_keywords": self._render_keywords,
+            "menu_stats": self._render_stats,
+            "menu_recent": self._render_recent,
+            "menu_help": self._render_help,
+        }
+        self._export_routes = {
+            "export_csv": "csv",
+            "export_json": "json",
+        }
+        
         self._setup_handlers()
     
     def set_monitor_instance(self, monitor):
         """Set the monitor instance for reload command"""
         self.monitor_instance = monitor
     
+    def _run_in_background(self, coro):
+        """Schedule a coroutine without waiting for it"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_background_done)
+        return task
+    
+    def _on_background_done(self, task: asyncio.Task):
+        """Forget a finished background task and log its failure"""
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            monitor_logger.error(f"Background task failed: {task.exception()}")
+    
+    def _take_token(self, action: str, user_id: int, rate: float, burst: int) -> bool:
+        """
+        Token bucket rate limit per user and action
+        
+        Args:
+            action: Name of the limited action
+            user_id: Telegram user ID
+            rate: Tokens refilled per second
+            burst: Maximum tokens that can be saved up
+        
+        Returns:
+            bool: True if the action is allowed
+        """
+        now = time.monotonic()
+        last_refill, tokens = self._buckets.get((action, user_id), (now, burst))
+        tokens = min(burst, tokens + (now - last_refill) * rate)
+        
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[(action, user_id)] = (now, tokens)
+        return allowed
+    
+    # ================== Cached Lookups ==================
+    
+    async def _get_channels_cached(self):
+        """Fetch active channels, reusing a recent result if available"""
+        if self._channels_cache:
+            channels, fetched_at = self._channels_cache
+            if time.monotonic() - fetched_at < self._cache_ttl:
+                return channels
+        
+        all_channels = await db.get_channels(active_only=False)
+        self._channels_by_key = {}
+        for ch in all_channels:
+            self._channels_by_key[ch['channel_id']] = ch
+            if ch['username']:
+                self._channels_by_key.setdefault(ch['username'], ch)
+        
+        channels = [ch for ch in all_channels if ch['is_active']]
+        self._channels_cache = (channels, time.monotonic())
+        return channels
+    
+    async def _get_keywords_cached(self):
+        """Fetch active keywords, reusing a recent result if available"""
+        if self._keywords_cache:
+            keywords, fetched_at = self._keywords_cache
+            if time.monotonic() - fetched_at < self._cache_ttl:
+                return keywords
+        
+        all_keywords = await db.get_keywords(active_only=False)
+        self._keywords_by_text = {kw['keyword']: kw for kw in all_keywords}
+        
+        keywords = [kw for kw in all_keywords if kw['is_active']]
+        self._keywords_cache = (keywords, time.monotonic())
+        return keywords
+    
+    async def _find_channel_cached(self, key: str):
+        """Find a channel by username or ID, falling back to the database"""
+        await self._get_channels_cached()
+        return self._channels_by_key.get(key) or await db.find_channel(key)
+    
+    async def _find_keyword_cached(self, keyword: str):
+        """Find a keyword by text, falling back to the database"""
+        await self._get_keywords_cached()
+        return self._keywords_by_text.get(keyword) or await db.find_keyword(keyword)
+    
+    def _invalidate_cache(self):
+        """Drop cached channels and keywords"""
+        self._channels_cache = None
+        self._keywords_cache = None
+    
     def _setup_handlers(self):
         """Setup command handlers"""
-        # Basic commands
-        self.client.add_handler(MessageHandler(
-            self._cmd_start, 
-            filters.command("start") & filters.user(self.admin_id)
-        ))
-        self.client.add_handler(MessageHandler(
-            self._cmd_help,
-            filters.command("help") & filters.user(self.admin_id)
-        ))
-        self.client.add_handler(MessageHandler(
-            self._cmd_status,
-            filters.command("status") & filters.user(self.admin_id)
-        ))
-        
-        # Channel management
-        self.client.add_handler(MessageHandler(
-            self._cmd_channels,
-            filters.command("channels") & filters.user(self.admin_id)
-        ))
-        self.client.add_handler(MessageHandler(
-            self._cmd_add_channel,
-            filters.command("addchannel") & filters.user(self.admin_id)
-        ))
-        self.client.add_handler(MessageHandler(
-            self._cmd_remove_channel,
-            filters.command("removechannel") & filters.user(self.admin_id)
-        ))
-        
-        # Keyword management
-        self.client.add_handler(MessageHandler(
-            self._cmd_keywords,
-            filters.command("keywords") & filters.user(self.admin_id)
-        ))
-        self.client.add_handler(MessageHandler(
-            self._cmd_add_keyword,
-            filters.command("addkeyword") & filters.user(self.admin_id)
-        ))
-        self.client.add_handler(MessageHandler(
-            self._cmd_remove_keyword,
-            filters.command("removekeyword") & filters.user(self.admin_id)
-        ))
-        
-        # Statistics and export
-        self.client.add_handler(MessageHandler(
-            self._cmd_stats,
-            filters.command("stats") & filters.user(self.admin_id)
-        ))
-        self.client.add_handler(MessageHandler(
-            self._cmd_recent,
-            filters.command("recent") & filters.user(self.admin_id)
-        ))
-        self.client.add_handler(MessageHandler(
-            self._cmd_export,
-            filters.command("export") & filters.user(self.admin_id)
-        ))
-        
-        # System control
+        commands = [
+            # Basic commands
+            ("start", self._cmd_start),
+            ("help", self._cmd_help),
+            ("status", self._cmd_status),
+            # Channel management
+            ("channels", self._cmd_channels),
+            ("addchannel", self._cmd_add_channel),
+            ("removechannel", self._cmd_remove_channel),
+            # Keyword management
+            ("keywords", self._cmd_keywords),
+            ("addkeyword", self._cmd_add_keyword),
+            ("removekeyword", self._cmd_remove_keyword),
+            # Statistics and export
+            ("stats", self._cmd_stats),
+            ("recent", self._cmd_recent),
+            ("export", self._cmd_export),
+            # System control
+            ("reload", self._cmd_reload),
+        ]
+        
+        # A single entry point checks the admin once, then routes and times the command
+        self._command_routes = dict(commands)
         self.client.add_handler(MessageHandler(
-            self._cmd_reload,
-            filters.command("reload") & filters.user(self.admin_id)
+            self._dispatch_command,
+            filters.command(list(self._command_routes)) & self._admin_filter
         ))
         
-        # Callback Query Handler
+        # Callback Query Handler - drop non-admin button presses before any work
         self.client.add_handler(CallbackQueryHandler(
-            self._callback_handler
+            self._callback_handler,
+            self._admin_filter
         ))
     
+    async def _dispatch_command(self, client: Client, message: Message):
+        """Route an admin command to its handler and record its latency"""
+        command = message.command[0]
+        handler = self._command_routes.get(command)
+        if not handler:
+            return
+        
+        started = time.monotonic()
+        try:
+            await handler(client, message)
+        finally:
+            elapsed = time.monotonic() - started
+            calls, total = self.command_timings.get(command, (0, 0.0))
+            self.command_timings[command] = (calls + 1, total + elapsed)
+            monitor_logger.debug(f"Command /{command} handled in {elapsed * 1000:.1f} ms")
+    
     # ================== Basic Commands ==================
     
     async def _cmd_start(self, client: Client, message: Message):
         """Start command"""
-        keyboard = InlineKeyboardMarkup([
-            [
-                InlineKeyboardButton("📢 Channels", callback_data="menu_channels"),
-                InlineKeyboardButton("🔑 Keywords", callback_data="menu_keywords")
-            ],
-            [
-                InlineKeyboardButton("📊 Statistics", callback_data="menu_stats"),
-                InlineKeyboardButton("📋 Recent Messages", callback_data="menu_recent")
-            ],
-            [
-                InlineKeyboardButton("ℹ️ Help", callback_data="menu_help")
-            ]
-        ])
-        
-        await message.reply(
-            "🤖 **Welcome to Channel Monitor Bot!**\n\n"
-            "Use the buttons below or type /help to see available commands.",
-            reply_markup=keyboard
-        )
+        await message.reply(WELCOME_TEXT, reply_markup=MAIN_MENU_KEYBOARD)
     
     async def _cmd_help(self, client: Client, message: Message):
         """Help command"""
-        help_text = """
-📚 **Available Commands:**
-
-**Basic Commands:**
-• /start - Main menu
-• /help - Show help
-• /status - System status
-
-**Channel Management:**
-• /channels - Show monitored channels
-• /addchannel @username - Add channel
-• /removechannel @username - Remove channel
-
-**Keyword Management:**
-• /keywords - Show keywords
-• /addkeyword word - Add keyword
-• /removekeyword word - Remove keyword
-
-**Statistics:**
-• /stats - General statistics
-• /recent - Recently detected messages
-• /export - Export data
-"""
-        await message.reply(help_text)
+        text, keyboard = await self._render_help()
+        await message.reply(text, reply_markup=keyboard)
+    
+    async def _render_help(self) -> Tuple[str, Optional[InlineKeyboardMarkup]]:
+        """Build the help reply"""
+        return HELP_TEXT, None
     
     async def _cmd_status(self, client: Client, message: Message):
         """Display system status"""
-        channels = await db.get_channels()
-        keywords = await db.get_keywords()
-        stats = await db.get_stats(days=1)
+        channels, keywords, stats = await asyncio.gather(
+            self._get_channels_cached(),
+            self._get_keywords_cached(),
+            db.get_stats(days=1)
+        )
         
         status_text = f"""
 📊 **System Status:**
@@ -171,32 +301,38 @@ class MonitorBot:
     
     async def _cmd_channels(self, client: Client, message: Message):
         """Display monitored channels"""
-        channels = await db.get_channels()
+        text, keyboard = await self._render_channels()
+        await message.reply(text, reply_markup=keyboard)
+    
+    async def _render_channels(self) -> Tuple[str, Optional[InlineKeyboardMarkup]]:
+        """Build the monitored channels reply"""
+        channels = await self._get_channels_cached()
         
         if not channels:
-            await message.reply("📢 No channels are currently being monitored.\n\nUse /addchannel @username to add a channel.")
-            return
-        
-        text = "📢 **Monitored Channels:**\n\n"
-        for i, ch in enumerate(channels, 1):
-            status = "🟢" if ch['is_active'] else "🔴"
-            text += f"{i}. {status} @{ch['username'] or ch['channel_id']}\n"
+            return "📢 No channels are currently being monitored.\n\nUse /addchannel @username to add a channel.", None
         
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton("➕ Add Channel", callback_data="add_channel")]
-        ])
-        
-        await message.reply(text, reply_markup=keyboard)
+        text = await self._format(self._format_channels, channels, len(channels))
+        return text, ADD_CHANNEL_KEYBOARD
+    
+    @staticmethod
+    def _format_channels(channels) -> str:
+        """Format the channel list"""
+        parts = ["📢 **Monitored Channels:**\n\n"]
+        parts.extend(
+            f"{i}. {STATUS_ICONS[bool(ch['is_active'])]} @{ch['username'] or ch['channel_id']}\n"
+            for i, ch in enumerate(channels, 1)
+        )
+        return "".join(parts)
     
     async def _cmd_add_channel(self, client: Client, message: Message):
         """Add a new channel"""
-        args = message.text.split(maxsplit=1)
+        arg = message.text.partition(' ')[2].strip()
         
-        if len(args) < 2:
+        if not arg:
             await message.reply("⚠️ **Usage:** /addchannel @username\n\nExample: `/addchannel @TechNews`")
             return
         
-        channel = args[1].strip().lstrip('@')
+        channel = arg.lstrip('@')
         
         try:
             # Attempt to get channel information
@@ -206,6 +342,7 @@ class MonitorBot:
                 username=chat.username,
                 title=chat.title
             )
+            self._channels_cache = None
             
             await message.reply(
                 f"✅ Channel added successfully!\n\n"
@@ -219,24 +356,20 @@ class MonitorBot:
     
     async def _cmd_remove_channel(self, client: Client, message: Message):
         """Remove a channel"""
-        args = message.text.split(maxsplit=1)
+        arg = message.text.partition(' ')[2].strip()
         
-        if len(args) < 2:
+        if not arg:
             await message.reply("⚠️ **Usage:** /removechannel @username")
             return
         
-        channel = args[1].strip().lstrip('@')
+        channel = arg.lstrip('@')
         
         # Search for the channel in the database
-        channels = await db.get_channels(active_only=False)
-        found = None
-        for ch in channels:
-            if ch['username'] == channel or ch['channel_id'] == channel:
-                found = ch
-                break
+        found = await self._find_channel_cached(channel)
         
         if found:
             await db.remove_channel(found['channel_id'])
+            self._channels_cache = None
             await message.reply(f"✅ Channel @{channel} removed successfully!")
             monitor_logger.info(f"Channel removed: @{channel}")
         else:
@@ -246,29 +379,34 @@ class MonitorBot:
     
     async def _cmd_keywords(self, client: Client, message: Message):
         """Display keywords"""
-        keywords = await db.get_keywords()
+        text, keyboard = await self._render_keywords()
+        await message.reply(text, reply_markup=keyboard)
+    
+    async def _render_keywords(self) -> Tuple[str, Optional[InlineKeyboardMarkup]]:
+        """Build the keywords reply"""
+        keywords = await self._get_keywords_cached()
         
         if not keywords:
-            await message.reply("🔑 No keywords found.\n\nUse /addkeyword word to add a keyword.")
-            return
+            return "🔑 No keywords found.\n\nUse /addkeyword word to add a keyword.", None
         
-        text = "🔑 **Keywords:**\n\n"
+        text = await self._format(self._format_keywords, keywords, len(keywords))
+        return text, ADD_KEYWORD_KEYBOARD
+    
+    @staticmethod
+    def _format_keywords(keywords) -> str:
+        """Format the keyword list"""
+        parts = ["🔑 **Keywords:**\n\n"]
         for i, kw in enumerate(keywords, 1):
-            status = "🟢" if kw['is_active'] else "🔴"
+            status = STATUS_ICONS[bool(kw['is_active'])]
             regex_tag = " (regex)" if kw['is_regex'] else ""
-            text += f"{i}. {status} `{kw['keyword']}`{regex_tag}\n"
-        
-        keyboard = InlineKeyboardMarkup([
-            [InlineKeyboardButton("➕ Add Keyword", callback_data="add_keyword")]
-        ])
-        
-        await message.reply(text, reply_markup=keyboard)
+            parts.append(f"{i}. {status} `{kw['keyword']}`{regex_tag}\n")
+        return "".join(parts)
     
     async def _cmd_add_keyword(self, client: Client, message: Message):
         """Add a keyword"""
-        args = message.text.split(maxsplit=1)
+        arg = message.text.partition(' ')[2].strip()
         
-        if len(args) < 2:
+        if not arg:
             await message.reply(
                 "⚠️ **Usage:** /addkeyword word\n\n"
                 "To add regex use:\n"
@@ -276,13 +414,14 @@ class MonitorBot:
             )
             return
         
-        keyword = args[1].strip()
+        keyword = arg
         is_regex = keyword.startswith("regex:")
         
         if is_regex:
             keyword = keyword[6:]  # Remove "regex:"
         
         await db.add_keyword(keyword, is_regex)
+        self._keywords_cache = None
         
         await message.reply(
             f"✅ Keyword added successfully!\n\n"
@@ -293,23 +432,19 @@ class MonitorBot:
     
     async def _cmd_remove_keyword(self, client: Client, message: Message):
         """Remove a keyword"""
-        args = message.text.split(maxsplit=1)
+        arg = message.text.partition(' ')[2].strip()
         
-        if len(args) < 2:
+        if not arg:
             await message.reply("⚠️ **Usage:** /removekeyword word")
             return
         
-        keyword = args[1].strip()
+        keyword = arg
         
-        keywords = await db.get_keywords(active_only=False)
-        found = None
-        for kw in keywords:
-            if kw['keyword'] == keyword:
-                found = kw
-                break
+        found = await self._find_keyword_cached(keyword)
         
         if found:
             await db.remove_keyword(found['id'])
+            self._keywords_cache = None
             await message.reply(f"✅ Keyword `{keyword}` removed successfully!")
             monitor_logger.info(f"Keyword removed: {keyword}")
         else:
@@ -319,62 +454,70 @@ class MonitorBot:
     
     async def _cmd_stats(self, client: Client, message: Message):
         """Display statistics"""
-        stats = await db.get_stats(days=7)
-        
-        text = f"""
+        text, keyboard = await self._render_stats()
+        await message.reply(text, reply_markup=keyboard)
+    
+    async def _render_stats(self) -> Tuple[str, Optional[InlineKeyboardMarkup]]:
+        """Build the statistics reply"""
+        stats = await db.get_stats(days=7, top_n=5)
+        rows = len(stats['top_keywords']) + len(stats['top_channels'])
+        return await self._format(self._format_stats, stats, rows), None
+    
+    @staticmethod
+    def _format_stats(stats) -> str:
+        """Format the statistics summary"""
+        parts = [f"""
 📊 **Monitoring Statistics:**
 
 📈 **Total Messages:** {stats['total_messages']}
 📅 **Today's Messages:** {stats['today_messages']}
 
 🏆 **Most Matched Keywords:**
-"""
-        for i, kw in enumerate(stats['top_keywords'][:5], 1):
-            text += f"  {i}. `{kw['keyword_matched']}` - {kw['count']} times\n"
+"""]
+        for i, kw in enumerate(stats['top_keywords'], 1):
+            parts.append(f"  {i}. `{kw['keyword_matched']}` - {kw['count']} times\n")
         
-        text += "\n📢 **Most Active Channels:**\n"
-        for i, ch in enumerate(stats['top_channels'][:5], 1):
-            text += f"  {i}. @{ch['channel_username']} - {ch['count']} messages\n"
+        parts.append("\n📢 **Most Active Channels:**\n")
+        for i, ch in enumerate(stats['top_channels'], 1):
+            parts.append(f"  {i}. @{ch['channel_username']} - {ch['count']} messages\n")
         
-        await message.reply(text)
+        return "".join(parts)
     
     async def _cmd_recent(self, client: Client, message: Message):
         """Display recently detected messages"""
-        messages = await db.get_detected_messages(limit=10)
+        text, keyboard = await self._render_recent()
+        await message.reply(text, reply_markup=keyboard)
+    
+    async def _render_recent(self) -> Tuple[str, Optional[InlineKeyboardMarkup]]:
+        """Build the recently detected messages reply"""
+        messages = await db.get_recent_previews(limit=10)
         
         if not messages:
-            await message.reply("📭 No messages detected yet.")
-            return
+            return "📭 No messages detected yet.", None
         
-        text = "📋 **Recently Detected Messages:**\n\n"
+        return await self._format(self._format_recent, messages, len(messages)), None
+    
+    @staticmethod
+    def _format_recent(messages) -> str:
+        """Format recently detected messages"""
+        parts = ["📋 **Recently Detected Messages:**\n\n"]
         
         for msg in messages:
-            text += f"🔹 **Channel:** @{msg['channel_username']}\n"
-            text += f"   **Keyword:** `{msg['keyword_matched']}`\n"
-            text += f"   **Time:** {msg['detected_at']}\n"
-            preview = (msg['message_text'] or "")[:100]
+            parts.append(f"🔹 **Channel:** @{msg['channel_username']}\n")
+            parts.append(f"   **Keyword:** `{msg['keyword_matched']}`\n")
+            parts.append(f"   **Time:** {msg['detected_at']}\n")
+            preview = msg['preview']
             if preview:
-                text += f"   **Content:** {preview}...\n"
-            text += "\n"
+                parts.append(f"   **Content:** {preview}...\n")
+            parts.append("\n")
         
-        await message.reply(text)
+        return "".join(parts)
     
     async def _cmd_export(self, client: Client, message: Message):
         """Export data"""
-        from exporter import DataExporter
-        
-        exporter = DataExporter()
-        
-        keyboard = InlineKeyboardMarkup([
-            [
-                InlineKeyboardButton("📊 CSV", callback_data="export_csv"),
-                InlineKeyboardButton("📋 JSON", callback_data="export_json")
-            ]
-        ])
-        
         await message.reply(
             "📤 **Choose export format:**",
-            reply_markup=keyboard
+            reply_markup=EXPORT_KEYBOARD
         )
     
     # ================== Callback Handler ==================
@@ -383,43 +526,68 @@ class MonitorBot:
         """Handle button clicks"""
         data = callback.data
         
-        if data == "menu_channels":
-            await self._cmd_channels(client, callback.message)
-        elif data == "menu_keywords":
-            await self._cmd_keywords(client, callback.message)
-        elif data == "menu_stats":
-            await self._cmd_stats(client, callback.message)
-        elif data == "menu_recent":
-            await self._cmd_recent(client, callback.message)
-        elif data == "menu_help":
-            await self._cmd_help(client, callback.message)
-        elif data == "export_csv":
-            await self._do_export(client, callback, "csv")
-        elif data == "export_json":
-            await self._do_export(client, callback, "json")
-        
-        await callback.answer()
+        # Throttle button spam before it turns into database queries
+        if not self._take_token("callback", callback.from_user.id, rate=1.0, burst=3):
+            await callback.answer("⏳ Too many requests, please slow down", show_alert=True)
+            return
+        
+        # Stop the button spinner right away rather than after the work is done
+        self._run_in_background(callback.answer())
+        
+        # Menu buttons edit the menu message in place instead of posting a new one
+        render = self._menu_routes.get(data)
+        if render:
+            await self._edit_menu(callback, render)
+        elif data in self._export_routes:
+            await self._do_export(client, callback, self._export_routes[data])
+    
+    async def _format(self, formatter, data, rows: int) -> str:
+        """Run a reply formatter, moving it off the event loop for large results"""
+        if rows > self.FORMAT_IN_THREAD_ROWS:
+            return await asyncio.to_thread(formatter, data)
+        return formatter(data)
+    
+    async def _edit_menu(self, callback: CallbackQuery, render):
+        """Replace the menu message with a rendered reply"""
+        text, keyboard = await render()
+        await callback.message.edit_text(text, reply_markup=keyboard)
     
     async def _do_export(self, client: Client, callback: CallbackQuery, format: str):
         """Execute export"""
-        from exporter import DataExporter
+        # Exports are the heaviest action - allow 2 at once, then 1 per minute
+        if not self._take_token("export", callback.from_user.id, rate=1 / 60, burst=2):
+            await callback.message.edit_text("⏳ Too many exports, please try again in a minute")
+            return
+        
+        if not await db.has_detected_messages():
+            await callback.message.edit_text("📭 Nothing to export")
+            return
         
         await callback.message.edit_text("⏳ Exporting...")
         
         exporter = DataExporter()
-        messages = await db.get_detected_messages(limit=10000)
+        # Stream rows straight from the database into the export file
+        messages = db.iter_detected_messages(limit=10000)
+        
+        async def report_progress(count: int):
+            # Edit sparingly - Telegram rate-limits message edits
+            if count % 2000 == 0:
+                self._run_in_background(
+                    callback.message.edit_text(f"⏳ Exporting... {count} messages so far")
+                )
         
         if format == "csv":
-            file_path = await exporter.export_to_csv(messages)
+            file_path = await exporter.export_to_csv(messages, on_progress=report_progress)
         else:
             file_path = await exporter.export_to_json(messages)
         
         if file_path and file_path.exists():
-            await client.send_document(
+            # Upload in the background so the handler is free for other updates
+            self._run_in_background(client.send_document(
                 callback.message.chat.id,
                 document=str(file_path),
-                caption=f"📤 Exported {len(messages)} messages"
-            )
+                caption=f"📤 Exported {exporter.last_export_count} messages"
+            ))
         else:
             await callback.message.edit_text("❌ Export failed")
     
@@ -427,6 +595,8 @@ class MonitorBot:
     
     async def _cmd_reload(self, client: Client, message: Message):
         """Reload configuration"""
+        self._invalidate_cache()
+        
         if not self.monitor_instance:
             await message.reply("❌ Cannot reload - system not connected")
             return
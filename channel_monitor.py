@@ -1,5 +1,27 @@
+import sys
+
+# Use the libuv-based event loop when available (uvloop does not support Windows)
+# Must be installed before the Client below grabs its event loop
+if sys.platform != "win32":
+    try:
+        import asyncio
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        # The uvloop policy does not create a loop on demand, but Pyrogram
+        # asks for the current loop at import time
+        asyncio.set_event_loop(asyncio.new_event_loop())
+    except ImportError:
+        pass
+
 from pyrogram import Client, filters
 
+# Optional C multi-pattern matcher (pip install pyahocorasick)
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
 # Your Telegram API account information
 api_id = 24327631      # ← Replace this with API ID from my.telegram.org
 api_hash = "9336fcbafd7ad01f90942a554343504c"  # ← Replace with API Hash
@@ -9,20 +31,59 @@ keywords = ["Only Order", "Only Buy", "Only rating",]  # ← Keywords you want t
 channels_to_monitor = ["@Ninja_Tester", "@CollectManiaa","@AmzGoldenDeals","@kingi_amz","@leepremiumde"]  # ← Channels you want to monitor
 notify_user_id = 1641576293  # ← Your personal ID on Telegram (use @userinfobot to get it)
 
+
+def build_matcher(words):
+    """Build an Aho-Corasick automaton that finds all keywords in one pass"""
+    if not HAS_AHOCORASICK:
+        return None
+    automaton = ahocorasick.Automaton()
+    for index, word in enumerate(words):
+        # Each keyword carries its list position (first one wins on duplicates)
+        if not automaton.exists(word.lower()):
+            automaton.add_word(word.lower(), (index, word))
+    automaton.make_automaton()
+    return automaton
+
+
+matcher = build_matcher(keywords)
+keywords_lower = [(keyword.lower(), keyword) for keyword in keywords]
+
+
+def find_keyword(text):
+    """Return the first keyword in list order found in the text, or None"""
+    low = text.lower()
+    if matcher is not None:
+        # Hits come in text order - keep the keyword listed first, like the loop below
+        hit = min((value for _, value in matcher.iter(low)), default=None)
+        return hit[1] if hit else None
+    
+    for keyword_lower, keyword in keywords_lower:
+        if keyword_lower in low:
+            return keyword
+    return None
+
+
 # Session setup
 app = Client("my_account", api_id=api_id, api_hash=api_hash)
 
 @app.on_message(filters.chat(channels_to_monitor))
 async def check_keywords(client, message):
-    text = message.text or message.caption or ""
-    for keyword in keywords:
-        if keyword.lower() in text.lower():
-            channel_name = message.chat.username or message.chat.title
-            await client.send_message(
-                notify_user_id,
-                f"**Word Found** `{keyword}` **In Channel** @{channel_name}:\n\n{text}"
-            )
-            break
-
-print("Monitoring started... Press Ctrl+C to stop.")
-app.run()
+    text = message.text or message.caption
+    if not text:
+        return  # Media without caption - nothing to search
+    
+    keyword = find_keyword(text)
+    if keyword:
+        channel_name = message.chat.username or message.chat.title
+        await client.send_message(
+            notify_user_id,
+            f"**Word Found** `{keyword}` **In Channel** @{channel_name}:\n\n{text}"
+        )
+
+if __name__ == "__main__":
+    from pyrogram_patches import disable_sticker_set_lookup
+    
+    # Skip the GetStickerSet request Pyrogram makes for every sticker (set_name is unused)
+    disable_sticker_set_lookup()
+    print("Monitoring started... Press Ctrl+C to stop.")
+    app.run()
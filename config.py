@@ -3,6 +3,7 @@ Central project settings
 Reads settings from .env file and provides them to other files
 """
 import os
+from dataclasses import dataclass
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -10,69 +11,106 @@ from dotenv import load_dotenv
 BASE_DIR = Path(__file__).resolve().parent
 load_dotenv(BASE_DIR / '.env')
 
+# Set once ensure_directories() has created the directories
+_directories_ready = False
 
+
+@dataclass(frozen=True)
 class Config:
-    """Application configuration"""
+    """Application configuration (read once from the environment by load())"""
     
     # Telegram API
-    API_ID = int(os.getenv('API_ID', 0))
-    API_HASH = os.getenv('API_HASH', '')
-    SESSION_NAME = os.getenv('SESSION_NAME', 'my_account')
-    NOTIFY_USER_ID = int(os.getenv('NOTIFY_USER_ID', 0))
+    API_ID: int
+    API_HASH: str
+    SESSION_NAME: str
+    NOTIFY_USER_ID: int
     
     # Notification destination (can be username like @channel or numeric ID)
     # If not set, defaults to NOTIFY_USER_ID (Saved Messages)
-    NOTIFY_CHAT_ID = os.getenv('NOTIFY_CHAT_ID', '')
+    NOTIFY_CHAT_ID: str
     
     # Bot
-    BOT_TOKEN = os.getenv('BOT_TOKEN', '')
+    BOT_TOKEN: str
     
     # Discord
-    DISCORD_WEBHOOK_URL = os.getenv('DISCORD_WEBHOOK_URL', '')
+    DISCORD_WEBHOOK_URL: str
     
     # Email
-    EMAIL_SMTP_SERVER = os.getenv('EMAIL_SMTP_SERVER', 'smtp.gmail.com')
-    EMAIL_SMTP_PORT = int(os.getenv('EMAIL_SMTP_PORT', 587))
-    EMAIL_USERNAME = os.getenv('EMAIL_USERNAME', '')
-    EMAIL_PASSWORD = os.getenv('EMAIL_PASSWORD', '')
-    EMAIL_TO = os.getenv('EMAIL_TO', '')
+    EMAIL_SMTP_SERVER: str
+    EMAIL_SMTP_PORT: int
+    EMAIL_USERNAME: str
+    EMAIL_PASSWORD: str
+    EMAIL_TO: str
     
     # Dashboard
-    DASHBOARD_SECRET_KEY = os.getenv('DASHBOARD_SECRET_KEY', 'change_this_secret')
-    DASHBOARD_PORT = int(os.getenv('DASHBOARD_PORT', 5000))
-    DASHBOARD_HOST = os.getenv('DASHBOARD_HOST', '127.0.0.1')
+    DASHBOARD_SECRET_KEY: str
+    DASHBOARD_PORT: int
+    DASHBOARD_HOST: str
     
     # Database
-    DATABASE_PATH = BASE_DIR / 'data' / 'channel_monitor.db'
+    DATABASE_PATH: Path
+    DATABASE_POOL_SIZE: int
     
     # Logs
-    LOG_DIR = BASE_DIR / 'logs'
-    LOG_FILE = LOG_DIR / 'monitor.log'
+    LOG_DIR: Path
+    LOG_FILE: Path
+    LOG_TO_FILE: bool
     
     # Exports
-    EXPORT_DIR = BASE_DIR / 'exports'
+    EXPORT_DIR: Path
     
     @classmethod
-    def validate(cls):
+    def load(cls) -> 'Config':
+        """Build the configuration from environment variables"""
+        log_dir = BASE_DIR / 'logs'
+        
+        return cls(
+            API_ID=int(os.getenv('API_ID', 0)),
+            API_HASH=os.getenv('API_HASH', ''),
+            SESSION_NAME=os.getenv('SESSION_NAME', 'my_account'),
+            NOTIFY_USER_ID=int(os.getenv('NOTIFY_USER_ID', 0)),
+            NOTIFY_CHAT_ID=os.getenv('NOTIFY_CHAT_ID', ''),
+            BOT_TOKEN=os.getenv('BOT_TOKEN', ''),
+            DISCORD_WEBHOOK_URL=os.getenv('DISCORD_WEBHOOK_URL', ''),
+            EMAIL_SMTP_SERVER=os.getenv('EMAIL_SMTP_SERVER', 'smtp.gmail.com'),
+            EMAIL_SMTP_PORT=int(os.getenv('EMAIL_SMTP_PORT', 587)),
+            EMAIL_USERNAME=os.getenv('EMAIL_USERNAME', ''),
+            EMAIL_PASSWORD=os.getenv('EMAIL_PASSWORD', ''),
+            EMAIL_TO=os.getenv('EMAIL_TO', ''),
+            DASHBOARD_SECRET_KEY=os.getenv('DASHBOARD_SECRET_KEY', 'change_this_secret'),
+            DASHBOARD_PORT=int(os.getenv('DASHBOARD_PORT', 5000)),
+            DASHBOARD_HOST=os.getenv('DASHBOARD_HOST', '127.0.0.1'),
+            DATABASE_PATH=BASE_DIR / 'data' / 'channel_monitor.db',
+            DATABASE_POOL_SIZE=int(os.getenv('DATABASE_POOL_SIZE', 4)),
+            LOG_DIR=log_dir,
+            LOG_FILE=log_dir / 'monitor.log',
+            LOG_TO_FILE=not os.getenv('MONITOR_NO_FILE_LOG'),
+            EXPORT_DIR=BASE_DIR / 'exports',
+        )
+    
+    def validate(self):
         """Validate basic configuration settings"""
         errors = []
         
-        if not cls.API_ID:
+        if not self.API_ID:
             errors.append("API_ID is not set")
-        if not cls.API_HASH:
+        if not self.API_HASH:
             errors.append("API_HASH is not set")
-        if not cls.NOTIFY_USER_ID:
+        if not self.NOTIFY_USER_ID:
             errors.append("NOTIFY_USER_ID is not set")
-            
+        
         return errors
     
-    @classmethod
-    def ensure_directories(cls):
-        """Create required directories"""
-        cls.DATABASE_PATH.parent.mkdir(parents=True, exist_ok=True)
-        cls.LOG_DIR.mkdir(parents=True, exist_ok=True)
-        cls.EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    def ensure_directories(self):
+        """Create required directories (only the first call touches the disk)"""
+        global _directories_ready
+        if _directories_ready:
+            return
+        self.DATABASE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        self.LOG_DIR.mkdir(parents=True, exist_ok=True)
+        self.EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+        _directories_ready = True
 
 
 # Create instance for direct use
-config = Config()
+config = Config.load()
@@ -3,16 +3,41 @@ Flask Dashboard for the Project
 Web interface for managing the monitoring system
 """
 import asyncio
+import base64
+import hashlib
+import threading
+import time
+from datetime import datetime
 from functools import wraps
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
+from flask import Flask, Response, g, render_template, request, jsonify, redirect, url_for, flash, make_response, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from jinja2 import FileSystemBytecodeCache
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    from waitress import serve
+    HAS_WAITRESS = True
+except ImportError:
+    HAS_WAITRESS = False
+
+try:
+    import resource  # Unix only
+    HAS_RESOURCE = True
+except ImportError:
+    HAS_RESOURCE = False
+
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from config import config
-from database import db
+from database import db, STATS_CACHE_TTL
 from logger import monitor_logger
 
 
@@ -22,6 +47,33 @@ app = Flask(__name__,
             static_folder='static')
 app.secret_key = config.DASHBOARD_SECRET_KEY
 
+# Keep compiled templates on disk so restarts skip parsing them again
+# (must be set before the first render creates the Jinja environment)
+JINJA_CACHE_DIR = config.DATABASE_PATH.parent / 'jinja_cache'
+JINJA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+app.jinja_options = {
+    **app.jinja_options,
+    'bytecode_cache': FileSystemBytecodeCache(str(JINJA_CACHE_DIR))
+}
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson (much faster for large row lists)"""
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(
+            obj,
+            default=self.default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+        ).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+if HAS_ORJSON:
+    app.json = OrjsonProvider(app)
+
 # Setup Flask-Login
 login_manager = LoginManager()
 login_manager.init_app(app)
@@ -45,32 +97,145 @@ def load_user(user_id):
     return None
 
 
-def async_action(f):
-    """Decorator to run async functions"""
-    @wraps(f)
-    def wrapper(*args, **kwargs):
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            return loop.run_until_complete(f(*args, **kwargs))
-        finally:
-            loop.close()
-    return wrapper
+# One long-lived event loop for all requests - the database connection
+# pool is bound to it, so it is opened once instead of on every request.
+# 'main.py both' hands in the monitor's loop instead (see run_dashboard).
+# Only database coroutines go to the loop; views, templates and response
+# streaming stay on the waitress worker thread so they never stall it
+_loop: asyncio.AbstractEventLoop = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """The event loop database work runs on (the dashboard's own is started on first use)"""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='dashboard-loop', daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+def run_async(coro):
+    """Run a coroutine on the dashboard event loop and wait for the result"""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+
+def iter_batches(rows, batch_size: int = 500):
+    """Consume an async iterator from sync code, one batch per loop round trip"""
+    async def next_batch():
+        batch = []
+        async for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                break
+        return batch
+    
+    try:
+        while True:
+            batch = run_async(next_batch())
+            if not batch:
+                break
+            yield batch
+    finally:
+        run_async(rows.aclose())
+
+
+async def gather(*coros):
+    """Await several coroutines side by side (pass the result to run_async)"""
+    return await asyncio.gather(*coros)
+
+
+# ==================== Metrics ====================
+
+MEMORY_LOG_INTERVAL = 60  # Seconds between memory usage log lines
+
+
+@app.before_request
+def start_timer():
+    """Remember when the request started"""
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def log_request_time(response):
+    """Log how long each request took"""
+    start = g.pop('request_start', None)
+    if start is not None:
+        duration_ms = (time.perf_counter() - start) * 1000
+        monitor_logger.debug(
+            "%s %s -> %s in %.1fms", request.method, request.path, response.status_code, duration_ms
+        )
+    return response
+
+
+async def log_memory_usage():
+    """Periodically log the peak resident memory of the dashboard process"""
+    while True:
+        await asyncio.sleep(MEMORY_LOG_INTERVAL)
+        # ru_maxrss is in kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == 'darwin':
+            peak //= 1024
+        monitor_logger.info("Dashboard peak memory: %.1f MB", peak / 1024)
+
+
+def cache_control(max_age: int = 0, stale_while_revalidate: int = 0):
+    """Decorator adding Cache-Control and an ETag to GET responses
+    
+    Responses are private (everything sits behind the login); a request
+    carrying a matching If-None-Match gets an empty 304.
+    """
+    directives = f'private, max-age={max_age}'
+    if stale_while_revalidate:
+        directives += f', stale-while-revalidate={stale_while_revalidate}'
+    
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            response = make_response(f(*args, **kwargs))
+            if request.method != 'GET' or response.status_code != 200:
+                return response
+            
+            response.headers['Cache-Control'] = directives
+            response.set_etag(hashlib.blake2b(response.get_data(), digest_size=8).hexdigest())
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
+
+
+def encode_cursor(row: dict) -> str:
+    """Encode the position of a message row as a URL-safe token"""
+    raw = f"{row['detected_at']}|{row['id']}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(token: str):
+    """Decode a pagination token back to (detected_at, id), None if invalid"""
+    if not token:
+        return None
+    try:
+        detected_at, _, row_id = base64.urlsafe_b64decode(token.encode()).decode().rpartition('|')
+        return (detected_at, int(row_id))
+    except ValueError:
+        return None
 
 
 # ==================== Pages ====================
 
 @app.route('/')
 @login_required
-@async_action
-async def index():
+def index():
     """Main page"""
-    await db.connect()
-    stats = await db.get_stats(days=7)
-    channels = await db.get_channels()
-    keywords = await db.get_keywords()
-    recent = await db.get_detected_messages(limit=5)
-    await db.disconnect()
+    # Independent reads - run them side by side on pooled reader connections
+    stats, channels, keywords, recent = run_async(gather(
+        db.get_stats(days=7),
+        db.get_channels(),
+        db.get_keywords(),
+        db.get_detected_messages(limit=5)
+    ))
     
     return render_template('index.html',
                           stats=stats,
@@ -102,54 +267,71 @@ def logout():
 
 @app.route('/channels')
 @login_required
-@async_action
-async def channels():
+def channels():
     """Channels page"""
-    await db.connect()
-    channels_list = await db.get_channels(active_only=False)
-    await db.disconnect()
+    channels_list = run_async(db.get_channels(active_only=False))
     return render_template('channels.html', channels=channels_list)
 
 
 @app.route('/keywords')
 @login_required
-@async_action
-async def keywords():
+def keywords():
     """Keywords page"""
-    await db.connect()
-    keywords_list = await db.get_keywords(active_only=False)
-    await db.disconnect()
+    keywords_list = run_async(db.get_keywords(active_only=False))
     return render_template('keywords.html', keywords=keywords_list)
 
 
 @app.route('/messages')
 @login_required
-@async_action
-async def messages():
+def messages():
     """Messages page"""
     page = request.args.get('page', 1, type=int)
+    cursor = decode_cursor(request.args.get('cursor'))
+    after = decode_cursor(request.args.get('after'))
     per_page = 20
     
-    await db.connect()
-    messages_list = await db.get_detected_messages(
-        limit=per_page, 
-        offset=(page - 1) * per_page
-    )
-    await db.disconnect()
+    # One extra row tells whether another page exists in that direction
+    if after:
+        messages_list = run_async(db.get_detected_messages(
+            limit=per_page + 1,
+            after=after
+        ))
+        has_prev = len(messages_list) > per_page
+        has_next = True
+        messages_list = messages_list[-per_page:]
+        if not has_prev:
+            # Paged back to the top - show the full first page instead
+            after, cursor, page = None, None, 1
+    
+    if not after:
+        messages_list = run_async(db.get_detected_messages(
+            limit=per_page + 1, 
+            before=cursor
+        ))
+        has_prev = cursor is not None
+        has_next = len(messages_list) > per_page
+        messages_list = messages_list[:per_page]
+    
+    prev_cursor = next_cursor = None
+    if messages_list:
+        if has_prev:
+            prev_cursor = encode_cursor(messages_list[0])
+        if has_next:
+            next_cursor = encode_cursor(messages_list[-1])
     
     return render_template('messages.html', 
                           messages=messages_list,
-                          page=page)
+                          page=page,
+                          prev_cursor=prev_cursor,
+                          next_cursor=next_cursor)
 
 
 @app.route('/stats')
 @login_required
-@async_action
-async def stats():
+@cache_control(max_age=STATS_CACHE_TTL, stale_while_revalidate=60)
+def stats():
     """Statistics page"""
-    await db.connect()
-    stats_data = await db.get_stats(days=30)
-    await db.disconnect()
+    stats_data = run_async(db.get_stats(days=30))
     return render_template('stats.html', stats=stats_data)
 
 
@@ -157,14 +339,11 @@ async def stats():
 
 @app.route('/api/channels', methods=['GET', 'POST', 'DELETE'])
 @login_required
-@async_action
-async def api_channels():
+@cache_control()
+def api_channels():
     """API for channels"""
-    await db.connect()
-    
     if request.method == 'GET':
-        channels = await db.get_channels(active_only=False)
-        await db.disconnect()
+        channels = run_async(db.get_channels(active_only=False))
         return jsonify(channels)
     
     elif request.method == 'POST':
@@ -173,40 +352,32 @@ async def api_channels():
         username = data.get('username')
         title = data.get('title')
         
-        result = await db.add_channel(channel_id, username, title)
-        await db.disconnect()
+        result = run_async(db.add_channel(channel_id, username, title))
         return jsonify({'success': bool(result), 'id': result})
     
     elif request.method == 'DELETE':
         channel_id = request.args.get('channel_id')
-        await db.remove_channel(channel_id)
-        await db.disconnect()
+        run_async(db.remove_channel(channel_id))
         return jsonify({'success': True})
 
 
 @app.route('/api/channels/<channel_id>/toggle', methods=['POST'])
 @login_required
-@async_action
-async def api_toggle_channel(channel_id):
+def api_toggle_channel(channel_id):
     """Enable/disable a channel"""
-    await db.connect()
     data = request.json
     is_active = data.get('is_active', True)
-    await db.toggle_channel(channel_id, is_active)
-    await db.disconnect()
+    run_async(db.toggle_channel(channel_id, is_active))
     return jsonify({'success': True})
 
 
 @app.route('/api/keywords', methods=['GET', 'POST', 'DELETE'])
 @login_required
-@async_action
-async def api_keywords():
+@cache_control()
+def api_keywords():
     """API for keywords"""
-    await db.connect()
-    
     if request.method == 'GET':
-        keywords = await db.get_keywords(active_only=False)
-        await db.disconnect()
+        keywords = run_async(db.get_keywords(active_only=False))
         return jsonify(keywords)
     
     elif request.method == 'POST':
@@ -214,92 +385,99 @@ async def api_keywords():
         keyword = data.get('keyword')
         is_regex = data.get('is_regex', False)
         
-        result = await db.add_keyword(keyword, is_regex)
-        await db.disconnect()
+        result = run_async(db.add_keyword(keyword, is_regex))
         return jsonify({'success': bool(result), 'id': result})
     
     elif request.method == 'DELETE':
         keyword_id = request.args.get('id', type=int)
-        await db.remove_keyword(keyword_id)
-        await db.disconnect()
+        run_async(db.remove_keyword(keyword_id))
         return jsonify({'success': True})
 
 
 @app.route('/api/keywords/<int:keyword_id>/toggle', methods=['POST'])
 @login_required
-@async_action
-async def api_toggle_keyword(keyword_id):
+def api_toggle_keyword(keyword_id):
     """Enable/disable a keyword"""
-    await db.connect()
     data = request.json
     is_active = data.get('is_active', True)
-    await db.toggle_keyword(keyword_id, is_active)
-    await db.disconnect()
+    run_async(db.toggle_keyword(keyword_id, is_active))
     return jsonify({'success': True})
 
 
 @app.route('/api/messages', methods=['GET'])
 @login_required
-@async_action
-async def api_messages():
+def api_messages():
     """API for messages"""
-    await db.connect()
-    
     limit = request.args.get('limit', 100, type=int)
     offset = request.args.get('offset', 0, type=int)
     channel = request.args.get('channel')
     keyword = request.args.get('keyword')
     
-    messages = await db.get_detected_messages(
+    messages = run_async(db.get_detected_messages(
         limit=limit,
         offset=offset,
         channel_id=channel,
         keyword=keyword
-    )
-    await db.disconnect()
+    ))
     return jsonify(messages)
 
 
 @app.route('/api/stats', methods=['GET'])
 @login_required
-@async_action
-async def api_stats():
+@cache_control(max_age=STATS_CACHE_TTL, stale_while_revalidate=60)
+def api_stats():
     """API for statistics"""
-    await db.connect()
     days = request.args.get('days', 7, type=int)
-    stats = await db.get_stats(days=days)
-    await db.disconnect()
+    stats = run_async(db.get_stats(days=days))
     return jsonify(stats)
 
 
 @app.route('/api/export/<format>')
 @login_required
-@async_action
-async def api_export(format):
-    """API for export"""
+def api_export(format):
+    """API for export - streams the file as it is read from the database"""
     from exporter import DataExporter
     
-    await db.connect()
-    messages = await db.get_detected_messages(limit=10000)
-    await db.disconnect()
-    
     exporter = DataExporter()
     
     if format == 'csv':
-        filepath = await exporter.export_to_csv(messages)
+        stream, mimetype = exporter.stream_csv, 'text/csv'
     elif format == 'json':
-        filepath = await exporter.export_to_json(messages)
+        stream, mimetype = exporter.stream_json, 'application/json'
     else:
         return jsonify({'error': 'Unsupported format'}), 400
     
-    if filepath:
-        return jsonify({'success': True, 'file': str(filepath)})
-    return jsonify({'error': 'Export failed'}), 500
+    batches = iter_batches(db.iter_detected_messages(limit=10000))
+    response = Response(stream_with_context(stream(batches)), mimetype=mimetype)
+    filename = f"export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
 
 
-def run_dashboard():
-    """Run the dashboard"""
+def run_dashboard(loop: asyncio.AbstractEventLoop = None):
+    """
+    Run the dashboard
+    
+    Args:
+        loop: Running event loop to share, with its already connected
+            database (used by 'main.py both'); by default the dashboard
+            starts its own loop and connects the database itself
+    """
+    global _loop
+    if loop is not None:
+        _loop = loop
+    else:
+        run_async(db.connect())
+    if HAS_RESOURCE:
+        asyncio.run_coroutine_threadsafe(log_memory_usage(), _get_loop())
     monitor_logger.info(f"🌐 Starting dashboard on http://{config.DASHBOARD_HOST}:{config.DASHBOARD_PORT}")
+    
+    if HAS_WAITRESS:
+        # Production WSGI server - also works inside the thread used by 'main.py both'
+        serve(app, host=config.DASHBOARD_HOST, port=config.DASHBOARD_PORT, threads=8)
+        return
+    
+    monitor_logger.warning("waitress not installed - using the Flask development server")
     app.run(
         host=config.DASHBOARD_HOST,
         port=config.DASHBOARD_PORT,
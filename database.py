@@ -2,46 +2,180 @@
 SQLite database for the project
 Stores messages, keywords, channels, and statistics
 """
+import asyncio
+import time
 import aiosqlite
+from contextlib import asynccontextmanager
+from functools import wraps
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator
 from pathlib import Path
 
 from config import config
 from logger import monitor_logger
 
 
+# Characters of message text kept in the preview column
+PREVIEW_LENGTH = 100
+
+# Seconds a get_stats() result is reused before the aggregates run again
+STATS_CACHE_TTL = 30
+
+# Statements slower than this are logged as warnings
+SLOW_QUERY_MS = 500
+
+# Detections remembered in memory for duplicate checks (oldest are dropped first)
+SEEN_WINDOW = '-1 day'
+SEEN_MAX_KEYS = 100000
+
+
+def _rows_to_dicts(cursor, rows) -> List[Dict]:
+    """Convert fetched rows to dicts, reading the column names only once"""
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def _copy_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a cached stats dict and its top lists (the rows inside are shared)"""
+    return {key: list(value) if isinstance(value, list) else value for key, value in stats.items()}
+
+
 class Database:
     """Database management"""
     
-    def __init__(self, db_path: Path = None):
+    def __init__(self, db_path: Path = None, pool_size: int = None):
         self.db_path = db_path or config.DATABASE_PATH
+        self.pool_size = config.DATABASE_POOL_SIZE if pool_size is None else pool_size
         self._connection = None
+        self._readers: List[aiosqlite.Connection] = []
+        self._read_pool: Optional[asyncio.Queue] = None
+        self._stats_cache: Dict[tuple, tuple] = {}  # (days, top_n) -> (expires_at, stats)
+        self._stats_lock = asyncio.Lock()
+        self._connect_lock = asyncio.Lock()  # Lets only the first concurrent caller connect
+        self._write_lock = asyncio.Lock()  # One writer on the main connection at a time
+        self._seen: Dict[tuple, None] = {}  # Insertion-ordered set of recent detections
     
     async def _ensure_connection(self):
         """Ensure database connection is active"""
         if self._connection is None:
-            await self.connect()
+            async with self._connect_lock:
+                if self._connection is None:
+                    await self.connect()
     
-    async def connect(self):
-        """Connect to database"""
-        config.ensure_directories()
-        self._connection = await aiosqlite.connect(
+    async def _open_connection(self) -> aiosqlite.Connection:
+        """Open a new connection with the project settings"""
+        connection = await aiosqlite.connect(
             self.db_path,
             timeout=30.0,  # 30 seconds timeout to avoid locks
-            isolation_level=None  # Auto-commit mode
+            isolation_level=None,  # Auto-commit mode
+            cached_statements=256  # Keep every query shape prepared
         )
-        self._connection.row_factory = aiosqlite.Row
+        connection.row_factory = aiosqlite.Row
+        connection.execute = self._timed(connection.execute)
+        await self._apply_pragmas(connection)
+        return connection
+    
+    @staticmethod
+    def _timed(execute):
+        """Wrap a connection's execute() to log statements slower than SLOW_QUERY_MS"""
+        @wraps(execute)
+        async def timed_execute(sql, parameters=None):
+            start = time.perf_counter()
+            cursor = await execute(sql, parameters)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            if elapsed_ms > SLOW_QUERY_MS:
+                monitor_logger.warning("Slow query %.1fms: %s", elapsed_ms, ' '.join(sql.split())[:200])
+            return cursor
+        return timed_execute
+    
+    async def _apply_pragmas(self, connection: aiosqlite.Connection):
+        """Tune a connection for the read-heavy dashboard and stats queries"""
+        # WAL keeps the database consistent with NORMAL sync; keep temp b-trees in RAM
+        await connection.execute("PRAGMA synchronous=NORMAL")
+        await connection.execute("PRAGMA temp_store=MEMORY")
+        # Up to 64 MB page cache, and read pages through a 256 MB memory map
+        await connection.execute("PRAGMA cache_size=-65536")
+        await connection.execute("PRAGMA mmap_size=268435456")
+    
+    async def connect(self):
+        """Connect to database"""
+        config.ensure_directories()
+        # Fresh lock for this event loop - ready before _connection is visible
+        # to concurrent callers of _ensure_connection()
+        self._stats_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+        self._connection = await self._open_connection()
         # Enable WAL mode for better concurrent access
         await self._connection.execute("PRAGMA journal_mode=WAL")
         await self._create_tables()
+        await self._migrate()
+        await self._load_seen()
+        
+        # Pool of reader connections - WAL lets them run alongside the writer
+        self._read_pool = asyncio.Queue()
+        for _ in range(self.pool_size):
+            reader = await self._open_connection()
+            # Readers never write - only the main connection takes the write lock
+            await reader.execute("PRAGMA query_only=ON")
+            self._readers.append(reader)
+            self._read_pool.put_nowait(reader)
+        
         monitor_logger.info(f"Connected to database: {self.db_path}")
     
     async def disconnect(self):
         """Disconnect"""
+        for reader in self._readers:
+            await reader.close()
+        self._readers.clear()
+        self._read_pool = None
+        
         if self._connection:
+            # Refresh planner statistics for the next run
+            await self._connection.execute("PRAGMA optimize")
             await self._connection.close()
             self._connection = None
+        
+        # The next connect() may run on another event loop (one asyncio.run per CLI command)
+        self._connect_lock = asyncio.Lock()
+    
+    @asynccontextmanager
+    async def _reader(self):
+        """Borrow a reader connection from the pool"""
+        await self._ensure_connection()
+        
+        # No pool configured - share the main connection
+        if not self._read_pool:
+            yield self._connection
+            return
+        
+        connection = await self._read_pool.get()
+        try:
+            yield connection
+        finally:
+            self._read_pool.put_nowait(connection)
+    
+    @asynccontextmanager
+    async def _writer(self, transaction: bool = False):
+        """
+        Use the main connection for writes, one caller at a time
+        
+        Without transaction every statement commits on its own (autocommit);
+        with it the block runs between BEGIN and COMMIT and is rolled back
+        if it raises - no other write can end or undo it halfway.
+        """
+        await self._ensure_connection()
+        async with self._write_lock:
+            if not transaction:
+                yield self._connection
+                return
+            
+            await self._connection.execute('BEGIN')
+            try:
+                yield self._connection
+            except BaseException:
+                await self._connection.rollback()
+                raise
+            await self._connection.commit()
     
     async def _create_tables(self):
         """Create tables"""
@@ -74,6 +208,7 @@ class Database:
                 channel_username TEXT,
                 keyword_matched TEXT NOT NULL,
                 message_text TEXT,
+                preview TEXT,
                 message_link TEXT,
                 detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 notification_sent INTEGER DEFAULT 0,
@@ -114,68 +249,110 @@ class Database:
             );
             
             -- Create indexes
-            CREATE INDEX IF NOT EXISTS idx_detected_messages_channel ON detected_messages(channel_id);
+            CREATE INDEX IF NOT EXISTS idx_channels_username ON channels(username);
+            CREATE INDEX IF NOT EXISTS idx_detected_messages_channel_user ON detected_messages(channel_id, channel_username);
             CREATE INDEX IF NOT EXISTS idx_detected_messages_keyword ON detected_messages(keyword_matched);
             CREATE INDEX IF NOT EXISTS idx_detected_messages_date ON detected_messages(detected_at);
         ''')
         await self._connection.commit()
     
+    async def _migrate(self):
+        """Bring tables created by older versions up to date"""
+        cursor = await self._connection.execute('PRAGMA table_info(detected_messages)')
+        columns = {row['name'] for row in await cursor.fetchall()}
+        
+        if 'preview' not in columns:
+            await self._connection.execute('ALTER TABLE detected_messages ADD COLUMN preview TEXT')
+            await self._connection.execute(
+                f'''UPDATE detected_messages SET preview = SUBSTR(message_text, 1, {PREVIEW_LENGTH})
+                   WHERE message_text IS NOT NULL'''
+            )
+            await self._connection.commit()
+        
+        # Superseded by the (channel_id, channel_username) covering index
+        await self._connection.execute('DROP INDEX IF EXISTS idx_detected_messages_channel')
+    
+    async def _load_seen(self):
+        """Remember recent detections so duplicate checks stay in memory"""
+        cursor = await self._connection.execute(
+            '''SELECT message_id, channel_id, keyword_matched FROM detected_messages
+               WHERE detected_at >= DATETIME('now', ?)
+               ORDER BY detected_at DESC LIMIT ?''',
+            (SEEN_WINDOW, SEEN_MAX_KEYS)
+        )
+        rows = await cursor.fetchall()
+        self._seen = dict.fromkeys(tuple(row) for row in reversed(rows))
+    
     # ===================== Channels =====================
     
     async def add_channel(self, channel_id: str, username: str = None, title: str = None) -> int:
         """Add new channel"""
-        await self._ensure_connection()
         try:
-            cursor = await self._connection.execute(
-                '''INSERT OR REPLACE INTO channels (channel_id, username, title, updated_at) 
-                   VALUES (?, ?, ?, ?)''',
-                (channel_id, username, title, datetime.now())
-            )
-            await self._connection.commit()
-            return cursor.lastrowid
+            async with self._writer() as conn:
+                # Upsert in place - keeps the row id instead of delete + insert
+                cursor = await conn.execute(
+                    '''INSERT INTO channels (channel_id, username, title) 
+                       VALUES (?, ?, ?)
+                       ON CONFLICT(channel_id) DO UPDATE SET
+                           username = excluded.username,
+                           title = excluded.title,
+                           is_active = 1,
+                           updated_at = CURRENT_TIMESTAMP
+                       RETURNING id''',
+                    (channel_id, username, title)
+                )
+                row = await cursor.fetchone()
+            return row[0]
         except Exception as e:
             monitor_logger.error(f"Error adding channel: {e}")
             return 0
     
     async def get_channels(self, active_only: bool = True) -> List[Dict]:
         """Fetch channels"""
-        await self._ensure_connection()
         query = 'SELECT * FROM channels'
         if active_only:
             query += ' WHERE is_active = 1'
         
-        cursor = await self._connection.execute(query)
-        rows = await cursor.fetchall()
-        return [dict(row) for row in rows]
+        async with self._reader() as conn:
+            cursor = await conn.execute(query)
+            rows = await cursor.fetchall()
+        return _rows_to_dicts(cursor, rows)
+    
+    async def find_channel(self, key: str) -> Optional[Dict]:
+        """Find a channel by username or channel ID"""
+        async with self._reader() as conn:
+            cursor = await conn.execute(
+                'SELECT * FROM channels WHERE username = ? OR channel_id = ? LIMIT 1',
+                (key, key)
+            )
+            row = await cursor.fetchone()
+        return dict(row) if row else None
     
     async def toggle_channel(self, channel_id: str, is_active: bool) -> bool:
         """Enable/disable channel"""
-        await self._ensure_connection()
-        await self._connection.execute(
-            'UPDATE channels SET is_active = ?, updated_at = ? WHERE channel_id = ?',
-            (1 if is_active else 0, datetime.now(), channel_id)
-        )
-        await self._connection.commit()
+        async with self._writer() as conn:
+            await conn.execute(
+                'UPDATE channels SET is_active = ?, updated_at = CURRENT_TIMESTAMP WHERE channel_id = ?',
+                (1 if is_active else 0, channel_id)
+            )
         return True
     
     async def remove_channel(self, channel_id: str) -> bool:
         """Delete channel"""
-        await self._ensure_connection()
-        await self._connection.execute('DELETE FROM channels WHERE channel_id = ?', (channel_id,))
-        await self._connection.commit()
+        async with self._writer() as conn:
+            await conn.execute('DELETE FROM channels WHERE channel_id = ?', (channel_id,))
         return True
     
     # ===================== Keywords =====================
     
     async def add_keyword(self, keyword: str, is_regex: bool = False) -> int:
         """Add keyword"""
-        await self._ensure_connection()
         try:
-            cursor = await self._connection.execute(
-                'INSERT OR IGNORE INTO keywords (keyword, is_regex) VALUES (?, ?)',
-                (keyword, 1 if is_regex else 0)
-            )
-            await self._connection.commit()
+            async with self._writer() as conn:
+                cursor = await conn.execute(
+                    'INSERT OR IGNORE INTO keywords (keyword, is_regex) VALUES (?, ?)',
+                    (keyword, 1 if is_regex else 0)
+                )
             return cursor.lastrowid
         except Exception as e:
             monitor_logger.error(f"Error adding keyword: {e}")
@@ -183,30 +360,38 @@ class Database:
     
     async def get_keywords(self, active_only: bool = True) -> List[Dict]:
         """Fetch keywords"""
-        await self._ensure_connection()
         query = 'SELECT * FROM keywords'
         if active_only:
             query += ' WHERE is_active = 1'
         
-        cursor = await self._connection.execute(query)
-        rows = await cursor.fetchall()
-        return [dict(row) for row in rows]
+        async with self._reader() as conn:
+            cursor = await conn.execute(query)
+            rows = await cursor.fetchall()
+        return _rows_to_dicts(cursor, rows)
+    
+    async def find_keyword(self, keyword: str) -> Optional[Dict]:
+        """Find a keyword by its text"""
+        async with self._reader() as conn:
+            cursor = await conn.execute(
+                'SELECT * FROM keywords WHERE keyword = ? LIMIT 1',
+                (keyword,)
+            )
+            row = await cursor.fetchone()
+        return dict(row) if row else None
     
     async def toggle_keyword(self, keyword_id: int, is_active: bool) -> bool:
         """Enable/disable keyword"""
-        await self._ensure_connection()
-        await self._connection.execute(
-            'UPDATE keywords SET is_active = ? WHERE id = ?',
-            (1 if is_active else 0, keyword_id)
-        )
-        await self._connection.commit()
+        async with self._writer() as conn:
+            await conn.execute(
+                'UPDATE keywords SET is_active = ? WHERE id = ?',
+                (1 if is_active else 0, keyword_id)
+            )
         return True
     
     async def remove_keyword(self, keyword_id: int) -> bool:
         """Delete keyword"""
-        await self._ensure_connection()
-        await self._connection.execute('DELETE FROM keywords WHERE id = ?', (keyword_id,))
-        await self._connection.commit()
+        async with self._writer() as conn:
+            await conn.execute('DELETE FROM keywords WHERE id = ?', (keyword_id,))
         return True
     
     # ===================== Detected Messages =====================
@@ -221,29 +406,109 @@ class Database:
         message_link: str = None
     ) -> int:
         """Add detected message"""
-        await self._ensure_connection()
         try:
-            cursor = await self._connection.execute(
-                '''INSERT OR IGNORE INTO detected_messages 
-                   (message_id, channel_id, channel_username, keyword_matched, message_text, message_link)
-                   VALUES (?, ?, ?, ?, ?, ?)''',
-                (message_id, channel_id, channel_username, keyword_matched, message_text, message_link)
-            )
-            await self._connection.commit()
+            async with self._writer() as conn:
+                cursor = await conn.execute(
+                    '''INSERT OR IGNORE INTO detected_messages 
+                       (message_id, channel_id, channel_username, keyword_matched, message_text, preview, message_link)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                    (message_id, channel_id, channel_username, keyword_matched, message_text,
+                     message_text[:PREVIEW_LENGTH] if message_text else None, message_link)
+                )
+            self.remember_detected(message_id, channel_id, keyword_matched)
+            # New detection - make the next get_stats() recount
+            self._stats_cache.clear()
             return cursor.lastrowid
         except Exception as e:
             monitor_logger.error(f"Error saving message: {e}")
             return 0
     
+    async def add_detected_messages_batch(self, rows: List[tuple]) -> int:
+        """Add many detected messages in a single transaction
+        
+        Each row is (message_id, channel_id, channel_username, keyword_matched,
+        message_text, message_link, notification_sent). Returns 0 if nothing
+        was saved - the caller still owns the rows and can try again.
+        """
+        if not rows:
+            return 0
+        
+        try:
+            async with self._writer(transaction=True) as conn:
+                await conn.executemany(
+                    '''INSERT OR IGNORE INTO detected_messages 
+                       (message_id, channel_id, channel_username, keyword_matched, message_text, preview,
+                        message_link, notification_sent)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                    [
+                        (message_id, channel_id, channel_username, keyword_matched, message_text,
+                         message_text[:PREVIEW_LENGTH] if message_text else None, message_link, int(sent))
+                        for message_id, channel_id, channel_username, keyword_matched, message_text,
+                            message_link, sent in rows
+                    ]
+                )
+            for row in rows:
+                self.remember_detected(row[0], row[1], row[3])
+            self._stats_cache.clear()
+            return len(rows)
+        except Exception as e:
+            monitor_logger.error(f"Error saving {len(rows)} messages: {e}")
+            return 0
+    
+    def remember_detected(self, message_id: int, channel_id: str, keyword: str) -> bool:
+        """Record a detection in the in-memory duplicate set
+        
+        Returns False when it was already there - check and record happen in
+        one step, so concurrent handlers cannot both claim the same message.
+        """
+        key = (message_id, channel_id, keyword)
+        if key in self._seen:
+            return False
+        self._seen[key] = None
+        if len(self._seen) > SEEN_MAX_KEYS:
+            del self._seen[next(iter(self._seen))]
+        return True
+    
+    def forget_detected(self, message_id: int, channel_id: str, keyword: str):
+        """Drop a detection from the in-memory duplicate set (it was never saved)"""
+        self._seen.pop((message_id, channel_id, keyword), None)
+    
+    async def _stored_detection(self, key: tuple) -> bool:
+        """Look a (message_id, channel_id, keyword) key up in the table (UNIQUE index)"""
+        async with self._reader() as conn:
+            cursor = await conn.execute(
+                '''SELECT 1 FROM detected_messages
+                   WHERE message_id = ? AND channel_id = ? AND keyword_matched = ? LIMIT 1''',
+                key
+            )
+            return await cursor.fetchone() is not None
+    
     async def is_message_detected(self, message_id: int, channel_id: str, keyword: str) -> bool:
         """Check if message was previously detected"""
         await self._ensure_connection()
-        cursor = await self._connection.execute(
-            '''SELECT 1 FROM detected_messages 
-               WHERE message_id = ? AND channel_id = ? AND keyword_matched = ?''',
-            (message_id, channel_id, keyword)
-        )
-        return await cursor.fetchone() is not None
+        key = (message_id, channel_id, keyword)
+        # Recent detections are answered from memory; older ones (evicted from
+        # the set, or from before the SEEN_WINDOW loaded at startup) need the table
+        return key in self._seen or await self._stored_detection(key)
+    
+    async def claim_detected(self, message_id: int, channel_id: str, keyword: str) -> bool:
+        """
+        Claim a new detection - False if it was detected before
+        
+        The in-memory claim is taken first, so concurrent handlers cannot both
+        win while the table lookup for older detections runs.
+        """
+        await self._ensure_connection()
+        if not self.remember_detected(message_id, channel_id, keyword):
+            return False
+        
+        try:
+            stored = await self._stored_detection((message_id, channel_id, keyword))
+        except BaseException:
+            self.forget_detected(message_id, channel_id, keyword)
+            raise
+        # A stored key stays in the set - the next check is answered from memory
+        return not stored
     
     async def get_detected_messages(
         self,
@@ -252,10 +517,17 @@ class Database:
         channel_id: str = None,
         keyword: str = None,
         date_from: datetime = None,
-        date_to: datetime = None
+        date_to: datetime = None,
+        before: tuple = None,
+        after: tuple = None
     ) -> List[Dict]:
-        """Fetch detected messages with filtering"""
-        await self._ensure_connection()
+        """Fetch detected messages with filtering
+        
+        before: (detected_at, id) of the last row already shown - keyset
+        pagination that costs the same on every page, unlike offset
+        after: (detected_at, id) of the first row shown - the rows just
+        newer than it, for paging back; still returned newest first
+        """
         query = 'SELECT * FROM detected_messages WHERE 1=1'
         params = []
         
@@ -275,21 +547,88 @@ class Database:
             query += ' AND detected_at <= ?'
             params.append(date_to)
         
-        query += ' ORDER BY detected_at DESC LIMIT ? OFFSET ?'
+        if before:
+            query += ' AND (detected_at, id) < (?, ?)'
+            params.extend(before)
+        
+        if after:
+            # Walk up from the cursor so the nearest rows come first
+            query += ' AND (detected_at, id) > (?, ?)'
+            params.extend(after)
+            query += ' ORDER BY detected_at ASC, id ASC LIMIT ? OFFSET ?'
+        else:
+            query += ' ORDER BY detected_at DESC, id DESC LIMIT ? OFFSET ?'
         params.extend([limit, offset])
         
-        cursor = await self._connection.execute(query, params)
-        rows = await cursor.fetchall()
-        return [dict(row) for row in rows]
+        async with self._reader() as conn:
+            cursor = await conn.execute(query, params)
+            rows = await cursor.fetchall()
+        if after:
+            rows = rows[::-1]
+        return _rows_to_dicts(cursor, rows)
+    
+    async def get_recent_previews(self, limit: int = 10) -> List[Dict]:
+        """Fetch the latest detections with only the short text preview"""
+        async with self._reader() as conn:
+            cursor = await conn.execute(
+                '''SELECT channel_username, keyword_matched, detected_at, preview
+                   FROM detected_messages
+                   ORDER BY detected_at DESC LIMIT ?''',
+                (limit,)
+            )
+            rows = await cursor.fetchall()
+        return _rows_to_dicts(cursor, rows)
+    
+    async def has_detected_messages(self) -> bool:
+        """Check whether any detected message is stored"""
+        async with self._reader() as conn:
+            cursor = await conn.execute('SELECT 1 FROM detected_messages LIMIT 1')
+            row = await cursor.fetchone()
+        return row is not None
+    
+    async def iter_detected_messages(
+        self,
+        limit: int = 10000,
+        batch_size: int = 1000
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream detected messages (newest first) without loading them all
+        
+        Rows are fetched in keyset-paginated batches so a reader connection
+        is only held for one batch at a time.
+        """
+        remaining = limit
+        last_key = None
+        
+        while remaining > 0:
+            query = 'SELECT * FROM detected_messages'
+            params = []
+            if last_key:
+                query += ' WHERE (detected_at, id) < (?, ?)'
+                params.extend(last_key)
+            query += ' ORDER BY detected_at DESC, id DESC LIMIT ?'
+            params.append(min(batch_size, remaining))
+            
+            async with self._reader() as conn:
+                cursor = await conn.execute(query, params)
+                rows = await cursor.fetchall()
+            
+            if not rows:
+                break
+            
+            for item in _rows_to_dicts(cursor, rows):
+                yield item
+            
+            remaining -= len(rows)
+            last_key = (rows[-1]['detected_at'], rows[-1]['id'])
     
     async def mark_notification_sent(self, message_id: int):
         """Update notification status"""
-        await self._ensure_connection()
-        await self._connection.execute(
-            'UPDATE detected_messages SET notification_sent = 1 WHERE id = ?',
-            (message_id,)
-        )
-        await self._connection.commit()
+        async with self._writer() as conn:
+            await conn.execute(
+                'UPDATE detected_messages SET notification_sent = 1 WHERE id = ?',
+                (message_id,)
+            )
     
     # ===================== Notifications =====================
     
@@ -302,59 +641,82 @@ class Database:
         error_message: str = None
     ) -> int:
         """Add notification record"""
-        await self._ensure_connection()
-        cursor = await self._connection.execute(
-            '''INSERT INTO notifications 
-               (detected_message_id, notification_type, destination, status, error_message, sent_at)
-               VALUES (?, ?, ?, ?, ?, ?)''',
-            (detected_message_id, notification_type, destination, status, error_message,
-             datetime.now() if status == 'sent' else None)
-        )
-        await self._connection.commit()
+        async with self._writer() as conn:
+            cursor = await conn.execute(
+                '''INSERT INTO notifications 
+                   (detected_message_id, notification_type, destination, status, error_message, sent_at)
+                   VALUES (?, ?, ?, ?, ?, CASE WHEN ? = 'sent' THEN CURRENT_TIMESTAMP END)''',
+                (detected_message_id, notification_type, destination, status, error_message, status)
+            )
         return cursor.lastrowid
     
     # ===================== Statistics =====================
     
-    async def get_stats(self, days: int = 7) -> Dict[str, Any]:
-        """Fetch general statistics"""
-        await self._ensure_connection()
-        # Total messages
-        cursor = await self._connection.execute('SELECT COUNT(*) FROM detected_messages')
-        total_messages = (await cursor.fetchone())[0]
-        
-        # Today's messages
-        cursor = await self._connection.execute(
-            "SELECT COUNT(*) FROM detected_messages WHERE DATE(detected_at) = DATE('now')"
-        )
-        today_messages = (await cursor.fetchone())[0]
+    async def get_stats(self, days: int = 7, top_n: int = 10) -> Dict[str, Any]:
+        """Fetch general statistics (cached for STATS_CACHE_TTL seconds)
         
-        # Most matched keywords
-        cursor = await self._connection.execute(
-            '''SELECT keyword_matched, COUNT(*) as count 
-               FROM detected_messages 
-               GROUP BY keyword_matched 
-               ORDER BY count DESC LIMIT 10'''
-        )
-        top_keywords = [dict(row) for row in await cursor.fetchall()]
+        Callers get their own copy, so changing it never touches the cache.
+        """
+        await self._ensure_connection()
+        key = (days, top_n)
         
-        # Most active channels
-        cursor = await self._connection.execute(
-            '''SELECT channel_username, COUNT(*) as count 
-               FROM detected_messages 
-               GROUP BY channel_id 
-               ORDER BY count DESC LIMIT 10'''
-        )
-        top_channels = [dict(row) for row in await cursor.fetchall()]
+        cached = self._stats_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return _copy_stats(cached[1])
         
-        # Recent days statistics
-        cursor = await self._connection.execute(
-            f'''SELECT DATE(detected_at) as date, COUNT(*) as count 
-                FROM detected_messages 
-                WHERE detected_at >= DATE('now', '-{days} days')
-                GROUP BY DATE(detected_at)
-                ORDER BY date DESC'''
-        )
-        daily_counts = [dict(row) for row in await cursor.fetchall()]
+        # One caller recomputes while concurrent callers wait for its result
+        async with self._stats_lock:
+            cached = self._stats_cache.get(key)
+            if cached and cached[0] > time.monotonic():
+                return _copy_stats(cached[1])
+            
+            stats = await self._query_stats(days, top_n)
+            self._stats_cache[key] = (time.monotonic() + STATS_CACHE_TTL, stats)
+            return _copy_stats(stats)
+    
+    async def _query_stats(self, days: int, top_n: int) -> Dict[str, Any]:
+        """Run the statistics queries (top lists are limited to top_n rows)"""
+        async with self._reader() as conn:
+            # Total messages
+            cursor = await conn.execute('SELECT COUNT(*) FROM detected_messages')
+            total_messages = (await cursor.fetchone())[0]
+            
+            # Today's messages
+            cursor = await conn.execute(
+                "SELECT COUNT(*) FROM detected_messages WHERE detected_at >= DATE('now')"
+            )
+            today_messages = (await cursor.fetchone())[0]
+            
+            # Most matched keywords
+            cursor = await conn.execute(
+                '''SELECT keyword_matched, COUNT(*) as count 
+                   FROM detected_messages 
+                   GROUP BY keyword_matched 
+                   ORDER BY count DESC LIMIT ?''',
+                (top_n,)
+            )
+            top_keywords = _rows_to_dicts(cursor, await cursor.fetchall())
+            
+            # Most active channels
+            cursor = await conn.execute(
+                '''SELECT channel_id, channel_username, COUNT(*) as count 
+                   FROM detected_messages 
+                   GROUP BY channel_id, channel_username 
+                   ORDER BY count DESC LIMIT ?''',
+                (top_n,)
+            )
+            top_channels = _rows_to_dicts(cursor, await cursor.fetchall())
+            
+            # Recent days statistics
+            cursor = await conn.execute(
+                '''SELECT DATE(detected_at) as date, COUNT(*) as count 
+                    FROM detected_messages 
+                    WHERE detected_at >= DATE('now', ?)
+                    GROUP BY DATE(detected_at)
+                    ORDER BY date DESC''',
+                (f'-{days} days',)
+            )
+            daily_counts = _rows_to_dicts(cursor, await cursor.fetchall())
         
         return {
             'total_messages': total_messages,
@@ -374,25 +736,24 @@ class Database:
         days_of_week: str = "0,1,2,3,4,5,6"
     ) -> int:
         """Add schedule"""
-        await self._ensure_connection()
-        cursor = await self._connection.execute(
-            '''INSERT INTO schedules (name, start_time, end_time, days_of_week)
-               VALUES (?, ?, ?, ?)''',
-            (name, start_time, end_time, days_of_week)
-        )
-        await self._connection.commit()
+        async with self._writer() as conn:
+            cursor = await conn.execute(
+                '''INSERT INTO schedules (name, start_time, end_time, days_of_week)
+                   VALUES (?, ?, ?, ?)''',
+                (name, start_time, end_time, days_of_week)
+            )
         return cursor.lastrowid
     
     async def get_schedules(self, active_only: bool = True) -> List[Dict]:
         """Fetch schedules"""
-        await self._ensure_connection()
         query = 'SELECT * FROM schedules'
         if active_only:
             query += ' WHERE is_active = 1'
         
-        cursor = await self._connection.execute(query)
-        rows = await cursor.fetchall()
-        return [dict(row) for row in rows]
+        async with self._reader() as conn:
+            cursor = await conn.execute(query)
+            rows = await cursor.fetchall()
+        return _rows_to_dicts(cursor, rows)
 
 
 # Singleton instance
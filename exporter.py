@@ -2,34 +2,159 @@
 Data export system
 Supports CSV and JSON export
 """
+import asyncio
+import importlib.util
+import io
+import itertools
+import time
+from operator import itemgetter
 import json
 import csv
+import shutil
+import tempfile
+import textwrap
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterable, Union, Callable, Awaitable, Iterable, Iterator
 
 from config import config
 from logger import monitor_logger
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+# Records can be a ready list or rows streamed from the database
+Records = Union[List[Dict[str, Any]], AsyncIterable[Dict[str, Any]]]
+
+
+def _json_default(value: Any) -> str:
+    """Serialize values JSON does not support (datetime as ISO 8601, anything else as str)"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+# Fixed parts of the statistics report (the ranked lists go in between)
+_REPORT_HEADER = """
+╔══════════════════════════════════════════════════════════════╗
+║           Channel Monitoring Statistics Report               ║
+║              {timestamp}                         ║
+╠══════════════════════════════════════════════════════════════╣
+║                                                              ║
+║  📊 General Statistics:                                      ║
+║  ━━━━━━━━━━━━━━━━━━━━                                        ║
+║  • Total Detected Messages: {total:>10}                 ║
+║  • Today's Messages: {today:>10}                              ║
+║                                                              ║
+║  🏆 Top Matching Keywords:                                   ║
+║  ━━━━━━━━━━━━━━━━━━━━━━━                                      ║
+"""
+
+_REPORT_CHANNELS_HEADER = """║                                                              ║
+║  📢 Most Active Channels:                                    ║
+║  ━━━━━━━━━━━━━━━━━━━━━━                                       ║
+"""
+
+_REPORT_FOOTER = """║                                                              ║
+╚══════════════════════════════════════════════════════════════╝
+"""
+
+
+def _csv_field(value: Any) -> str:
+    """Format one CSV cell the way csv.writer does (None empty, quoted only when needed)"""
+    if value is None:
+        return ''
+    text = str(value)
+    if ',' in text or '"' in text or '\n' in text or '\r' in text:
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def _json_dumps(value: Any, pretty: bool = False) -> str:
+    """JSON text for one value (compact, or indented by 2), using orjson when installed"""
+    if HAS_ORJSON:
+        option = orjson.OPT_INDENT_2 if pretty else 0
+        return orjson.dumps(value, default=_json_default, option=option).decode()
+    return json.dumps(value, ensure_ascii=False, default=_json_default, indent=2 if pretty else None)
+
 
 class DataExporter:
     """Export data to various formats"""
     
+    # CSV columns
+    CSV_FIELDNAMES = [
+        'id', 'message_id', 'channel_id', 'channel_username',
+        'keyword_matched', 'message_text', 'message_link',
+        'detected_at', 'notification_sent'
+    ]
+    _csv_values = itemgetter(*CSV_FIELDNAMES)  # Row dict -> tuple in column order
+    
+    WRITE_BUFFER_SIZE = 1 << 20  # 1 MB file buffer
+    STREAM_BATCH_SIZE = 500  # Streamed rows written per worker-thread call
+    
+    _sequence = itertools.count()  # Shared by all exporters in the process
+    
     def __init__(self, export_dir: Path = None):
         self.export_dir = export_dir or config.EXPORT_DIR
+        self.last_export_count = 0  # Records written by the last export
         config.ensure_directories()
     
+    @classmethod
+    def _csv_header(cls) -> str:
+        """CSV header line"""
+        return ','.join(cls.CSV_FIELDNAMES) + '\r\n'
+    
+    @classmethod
+    def _csv_rows(cls, rows: List[Dict[str, Any]]) -> str:
+        """Format rows as CSV text
+        
+        One f-string per row for the fixed CSV_FIELDNAMES columns (keep both
+        in the same order) - much cheaper than csv.DictWriter's per-cell work.
+        id and message_id are NOT NULL integers and never need quoting.
+        """
+        try:
+            return ''.join(
+                f"{r['id']},{r['message_id']},{_csv_field(r['channel_id'])},"
+                f"{_csv_field(r['channel_username'])},{_csv_field(r['keyword_matched'])},"
+                f"{_csv_field(r['message_text'])},{_csv_field(r['message_link'])},"
+                f"{_csv_field(r['detected_at'])},{_csv_field(r['notification_sent'])}\r\n"
+                for r in rows
+            )
+        except KeyError:
+            # Some rows lack columns - csv.writer on tuples, blanks for the gaps
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(map(cls._csv_tuple, rows))
+            return buffer.getvalue()
+    
+    @classmethod
+    def _csv_tuple(cls, row: Dict[str, Any]) -> tuple:
+        """Row values in CSV column order ('' for missing columns)"""
+        try:
+            return cls._csv_values(row)
+        except KeyError:
+            return tuple(row.get(k, '') for k in cls.CSV_FIELDNAMES)
+    
+    def _write_csv_rows(self, f, rows: List[Dict[str, Any]]):
+        """Format and write a batch of rows (blocking - run it in a worker thread)"""
+        f.write(self._csv_rows(rows))
+    
     def _generate_filename(self, extension: str) -> Path:
         """Generate unique filename"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        return self.export_dir / f"export_{timestamp}.{extension}"
+        # The counter keeps exports started within the same second apart
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        return self.export_dir / f"export_{timestamp}_{next(self._sequence)}.{extension}"
     
-    async def export_to_csv(
+    def export_to_csv_sync(
         self, 
         data: List[Dict[str, Any]], 
         filename: Path = None
     ) -> Optional[Path]:
-        """Export to CSV"""
+        """Export to CSV (blocking - run it in a worker thread)"""
+        self.last_export_count = 0
         if not data:
             monitor_logger.warning("No data to export")
             return None
@@ -37,18 +162,12 @@ class DataExporter:
         filepath = filename or self._generate_filename("csv")
         
         try:
-            # Define columns
-            fieldnames = [
-                'id', 'message_id', 'channel_id', 'channel_username',
-                'keyword_matched', 'message_text', 'message_link',
-                'detected_at', 'notification_sent'
-            ]
-            
-            with open(filepath, 'w', newline='', encoding='utf-8-sig') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
-                writer.writeheader()
-                writer.writerows(data)
+            with open(filepath, 'w', newline='', encoding='utf-8-sig',
+                      buffering=self.WRITE_BUFFER_SIZE) as f:
+                f.write(self._csv_header())
+                f.write(self._csv_rows(data))
             
+            self.last_export_count = len(data)
             monitor_logger.info(f"Exported {len(data)} records to {filepath}")
             return filepath
             
@@ -56,13 +175,72 @@ class DataExporter:
             monitor_logger.error(f"Error exporting CSV: {e}")
             return None
     
-    async def export_to_json(
+    async def export_to_csv(
+        self, 
+        data: Records, 
+        filename: Path = None,
+        on_progress: Optional[Callable[[int], Awaitable[None]]] = None
+    ) -> Optional[Path]:
+        """
+        Export to CSV (rows may be streamed from an async iterable)
+        
+        Args:
+            data: Records to export
+            filename: Output file (generated if not given)
+            on_progress: Awaited with the running row count after each streamed batch
+        """
+        if not hasattr(data, '__aiter__'):
+            return await asyncio.to_thread(self.export_to_csv_sync, data, filename)
+        
+        self.last_export_count = 0
+        filepath = filename or self._generate_filename("csv")
+        
+        try:
+            count = 0
+            f = await asyncio.to_thread(
+                open, filepath, 'w', newline='', encoding='utf-8-sig',
+                buffering=self.WRITE_BUFFER_SIZE
+            )
+            try:
+                await asyncio.to_thread(f.write, self._csv_header())
+                
+                # Write in batches so the event loop only waits on the thread per batch
+                batch = []
+                async for row in data:
+                    batch.append(row)
+                    if len(batch) >= self.STREAM_BATCH_SIZE:
+                        await asyncio.to_thread(self._write_csv_rows, f, batch)
+                        count += len(batch)
+                        batch = []
+                        if on_progress:
+                            await on_progress(count)
+                if batch:
+                    await asyncio.to_thread(self._write_csv_rows, f, batch)
+                    count += len(batch)
+            finally:
+                await asyncio.to_thread(f.close)
+            
+            if not count:
+                filepath.unlink(missing_ok=True)
+                monitor_logger.warning("No data to export")
+                return None
+            
+            self.last_export_count = count
+            monitor_logger.info(f"Exported {count} records to {filepath}")
+            return filepath
+            
+        except Exception as e:
+            monitor_logger.error(f"Error exporting CSV: {e}")
+            return None
+    
+    def export_to_json_sync(
         self, 
         data: List[Dict[str, Any]], 
         filename: Path = None,
         pretty: bool = True
     ) -> Optional[Path]:
-        """Export to JSON"""
+        """Export to JSON (blocking - run it in a worker thread)"""
+        self.last_export_count = 0
         if not data:
             monitor_logger.warning("No data to export")
             return None
@@ -70,29 +248,25 @@ class DataExporter:
         filepath = filename or self._generate_filename("json")
         
         try:
-            # Convert datetime to string
-            serializable_data = []
-            for item in data:
-                clean_item = {}
-                for key, value in item.items():
-                    if isinstance(value, datetime):
-                        clean_item[key] = value.isoformat()
-                    else:
-                        clean_item[key] = value
-                serializable_data.append(clean_item)
-            
+            # datetime values are handled by the encoder itself, no copy of the rows needed
             export_obj = {
                 "exported_at": datetime.now().isoformat(),
-                "total_records": len(serializable_data),
-                "data": serializable_data
+                "total_records": len(data),
+                "data": data
             }
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                if pretty:
-                    json.dump(export_obj, f, ensure_ascii=False, indent=2)
-                else:
-                    json.dump(export_obj, f, ensure_ascii=False)
+            if HAS_ORJSON:
+                option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+                with open(filepath, 'wb') as f:
+                    f.write(orjson.dumps(export_obj, default=_json_default, option=option))
+            else:
+                with open(filepath, 'w', encoding='utf-8', buffering=self.WRITE_BUFFER_SIZE) as f:
+                    json.dump(
+                        export_obj, f, ensure_ascii=False, default=_json_default,
+                        indent=2 if pretty else None
+                    )
             
+            self.last_export_count = len(data)
             monitor_logger.info(f"Exported {len(data)} records to {filepath}")
             return filepath
             
@@ -100,41 +274,146 @@ class DataExporter:
             monitor_logger.error(f"Error exporting JSON: {e}")
             return None
     
+    async def export_to_json(
+        self, 
+        data: Records, 
+        filename: Path = None,
+        pretty: bool = True
+    ) -> Optional[Path]:
+        """
+        Export to JSON
+        
+        Rows from an async iterable are spooled batch by batch to a scratch
+        file, so memory stays at one batch no matter how many rows there are;
+        the result has the same layout as for a list.
+        """
+        if not hasattr(data, '__aiter__'):
+            return await asyncio.to_thread(self.export_to_json_sync, data, filename, pretty)
+        
+        self.last_export_count = 0
+        filepath = filename or self._generate_filename("json")
+        
+        try:
+            count = 0
+            # total_records comes before the rows, so they are counted into a
+            # scratch file first and copied behind the header afterwards
+            spool = await asyncio.to_thread(
+                tempfile.TemporaryFile, 'w+', encoding='utf-8', dir=self.export_dir
+            )
+            try:
+                batch = []
+                async for row in data:
+                    batch.append(row)
+                    if len(batch) >= self.STREAM_BATCH_SIZE:
+                        await asyncio.to_thread(spool.write, self._json_rows(batch, count, pretty))
+                        count += len(batch)
+                        batch = []
+                if batch:
+                    await asyncio.to_thread(spool.write, self._json_rows(batch, count, pretty))
+                    count += len(batch)
+                
+                if count:
+                    await asyncio.to_thread(self._write_spooled_json, spool, filepath, count, pretty)
+            finally:
+                await asyncio.to_thread(spool.close)
+            
+            if not count:
+                monitor_logger.warning("No data to export")
+                return None
+            
+            self.last_export_count = count
+            monitor_logger.info(f"Exported {count} records to {filepath}")
+            return filepath
+            
+        except Exception as e:
+            monitor_logger.error(f"Error exporting JSON: {e}")
+            return None
+    
+    def _write_spooled_json(self, spool, filepath: Path, count: int, pretty: bool):
+        """Write a JSON export around rows already spooled to a scratch file"""
+        spool.seek(0)
+        with open(filepath, 'w', encoding='utf-8', buffering=self.WRITE_BUFFER_SIZE) as f:
+            f.write(self._json_head(count, pretty))
+            shutil.copyfileobj(spool, f, self.WRITE_BUFFER_SIZE)
+            f.write(self._json_tail(pretty=pretty))
+    
+    @staticmethod
+    def _json_head(total: int = None, pretty: bool = False) -> str:
+        """Opening of a JSON export up to the data array (with total_records when known)"""
+        fields = {"exported_at": datetime.now().isoformat()}
+        if total is not None:
+            fields["total_records"] = total
+        if pretty:
+            lines = ''.join(f'  "{key}": {json.dumps(value)},\n' for key, value in fields.items())
+            return '{\n' + lines + '  "data": [\n'
+        head = ''.join(f'"{key}": {json.dumps(value)}, ' for key, value in fields.items())
+        return '{' + head + '"data": ['
+    
+    @staticmethod
+    def _json_rows(rows: List[Dict[str, Any]], written: int, pretty: bool = False) -> str:
+        """JSON text for a batch of rows (comma-led when rows were written before)"""
+        if pretty:
+            chunk = ',\n'.join(textwrap.indent(_json_dumps(item, pretty=True), '    ') for item in rows)
+            return (',\n' if written else '') + chunk
+        chunk = ', '.join(_json_dumps(item) for item in rows)
+        return (', ' if written else '') + chunk
+    
+    @staticmethod
+    def _json_tail(count: int = None, pretty: bool = False) -> str:
+        """Closing of a JSON export (with total_records when it was not known up front)"""
+        tail = '\n  ]' if pretty else ']'
+        if count is not None:
+            tail += (',\n  ' if pretty else ', ') + f'"total_records": {count}'
+        return tail + ('\n}' if pretty else '}')
+    
+    def stream_csv(self, batches: Iterable[List[Dict[str, Any]]]) -> Iterator[str]:
+        """Yield a CSV document chunk by chunk (one chunk per batch of rows)"""
+        # BOM first, like the utf-8-sig files, so Excel detects UTF-8
+        yield '\ufeff' + self._csv_header()
+        
+        for batch in batches:
+            yield self._csv_rows(batch)
+    
+    def stream_json(self, batches: Iterable[List[Dict[str, Any]]]) -> Iterator[str]:
+        """Yield a JSON document chunk by chunk (total_records last - it is only known at the end)"""
+        yield self._json_head()
+        
+        count = 0
+        for batch in batches:
+            if not batch:
+                continue
+            yield self._json_rows(batch, count)
+            count += len(batch)
+        
+        yield self._json_tail(count)
+    
     async def export_stats_report(self, stats: Dict[str, Any]) -> Optional[Path]:
         """Export statistics report"""
+        return await asyncio.to_thread(self.export_stats_report_sync, stats)
+    
+    def export_stats_report_sync(self, stats: Dict[str, Any]) -> Optional[Path]:
+        """Export statistics report (blocking - run it in a worker thread)"""
         filepath = self._generate_filename("txt")
         
         try:
-            report = f"""
-╔══════════════════════════════════════════════════════════════╗
-║           Channel Monitoring Statistics Report               ║
-║              {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}                         ║
-╠══════════════════════════════════════════════════════════════╣
-║                                                              ║
-║  📊 General Statistics:                                      ║
-║  ━━━━━━━━━━━━━━━━━━━━                                        ║
-║  • Total Detected Messages: {stats['total_messages']:>10}                 ║
-║  • Today's Messages: {stats['today_messages']:>10}                              ║
-║                                                              ║
-║  🏆 Top Matching Keywords:                                   ║
-║  ━━━━━━━━━━━━━━━━━━━━━━━                                      ║
-"""
-            for i, kw in enumerate(stats.get('top_keywords', [])[:10], 1):
-                report += f"║  {i:>2}. {kw['keyword_matched']:<20} - {kw['count']:>5} times    ║\n"
-            
-            report += """║                                                              ║
-║  📢 Most Active Channels:                                    ║
-║  ━━━━━━━━━━━━━━━━━━━━━━                                       ║
-"""
-            for i, ch in enumerate(stats.get('top_channels', [])[:10], 1):
-                report += f"║  {i:>2}. @{ch['channel_username']:<18} - {ch['count']:>5} messages║\n"
-            
-            report += """║                                                              ║
-╚══════════════════════════════════════════════════════════════╝
-"""
+            parts = [_REPORT_HEADER.format(
+                timestamp=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                total=stats['total_messages'],
+                today=stats['today_messages']
+            )]
+            parts.extend(
+                f"║  {i:>2}. {kw['keyword_matched']:<20} - {kw['count']:>5} times    ║\n"
+                for i, kw in enumerate(stats.get('top_keywords', [])[:10], 1)
+            )
+            parts.append(_REPORT_CHANNELS_HEADER)
+            parts.extend(
+                f"║  {i:>2}. @{ch['channel_username']:<18} - {ch['count']:>5} messages║\n"
+                for i, ch in enumerate(stats.get('top_channels', [])[:10], 1)
+            )
+            parts.append(_REPORT_FOOTER)
             
             with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(report)
+                f.write(''.join(parts))
             
             monitor_logger.info(f"Report exported to {filepath}")
             return filepath
@@ -145,11 +424,12 @@ class DataExporter:
 
 
 # Pandas Export (optional - for advanced export)
-try:
-    import pandas as pd
-    HAS_PANDAS = True
-except ImportError:
-    HAS_PANDAS = False
+# Only checked here - pandas itself is imported on first use, so processes
+# that never export to Excel don't pay for loading it
+HAS_PANDAS = importlib.util.find_spec('pandas') is not None
+
+# Streaming Excel writer (optional - falls back to openpyxl)
+HAS_XLSXWRITER = importlib.util.find_spec('xlsxwriter') is not None
 
 
 class AdvancedExporter(DataExporter):
@@ -166,8 +446,16 @@ class AdvancedExporter(DataExporter):
         filename: Path = None
     ) -> Optional[Path]:
         """Export to Excel"""
-        if not HAS_PANDAS:
-            monitor_logger.error("Pandas required for Excel export")
+        return await asyncio.to_thread(self.export_to_excel_sync, data, filename)
+    
+    def export_to_excel_sync(
+        self, 
+        data: List[Dict[str, Any]], 
+        filename: Path = None
+    ) -> Optional[Path]:
+        """Export to Excel (blocking - run it in a worker thread)"""
+        if not HAS_XLSXWRITER and not HAS_PANDAS:
+            monitor_logger.error("xlsxwriter or Pandas required for Excel export")
             return None
         
         if not data:
@@ -176,8 +464,11 @@ class AdvancedExporter(DataExporter):
         filepath = filename or self._generate_filename("xlsx")
         
         try:
-            df = pd.DataFrame(data)
-            df.to_excel(filepath, index=False, engine='openpyxl')
+            if HAS_XLSXWRITER:
+                self._write_xlsx(filepath, data)
+            else:
+                import pandas as pd
+                pd.DataFrame(data).to_excel(filepath, index=False, engine='openpyxl')
             
             monitor_logger.info(f"Exported {len(data)} records to {filepath}")
             return filepath
@@ -186,6 +477,30 @@ class AdvancedExporter(DataExporter):
             monitor_logger.error(f"Error exporting Excel: {e}")
             return None
     
+    @staticmethod
+    def _write_xlsx(filepath: Path, data: List[Dict[str, Any]]):
+        """Write rows to an .xlsx file with xlsxwriter, one whole row at a time"""
+        import xlsxwriter
+        
+        # Columns in first-seen order, like pd.DataFrame(data)
+        columns = list(dict.fromkeys(key for row in data for key in row))
+        
+        # constant_memory flushes each finished row to disk instead of keeping the
+        # sheet in RAM - so every row must be written complete and in order
+        # (pandas.to_excel writes column by column and loses cells here)
+        workbook = xlsxwriter.Workbook(str(filepath), {
+            'constant_memory': True,
+            'strings_to_urls': False,
+            'default_date_format': 'yyyy-mm-dd hh:mm:ss'
+        })
+        try:
+            worksheet = workbook.add_worksheet()
+            worksheet.write_row(0, 0, columns, workbook.add_format({'bold': True}))
+            for row_num, row in enumerate(data, 1):
+                worksheet.write_row(row_num, 0, [row.get(column) for column in columns])
+        finally:
+            workbook.close()
+    
     async def export_filtered(
         self,
         data: List[Dict[str, Any]],
@@ -197,27 +512,38 @@ class AdvancedExporter(DataExporter):
     ) -> Optional[Path]:
         """Filtered export"""
         if not HAS_PANDAS:
-            # Use basic export
-            filtered = data
-            if channel_filter:
-                filtered = [d for d in filtered if d.get('channel_username') == channel_filter]
-            if keyword_filter:
-                filtered = [d for d in filtered if d.get('keyword_matched') == keyword_filter]
+            # Use basic export - one pass over the rows for all filters
+            def keep(d: Dict[str, Any]) -> bool:
+                if channel_filter and d.get('channel_username') != channel_filter:
+                    return False
+                if keyword_filter and d.get('keyword_matched') != keyword_filter:
+                    return False
+                return True
+            
+            filtered = [d for d in data if keep(d)] if channel_filter or keyword_filter else data
             
             if format == "json":
                 return await self.export_to_json(filtered)
             return await self.export_to_csv(filtered)
         
+        import pandas as pd
+        
         df = pd.DataFrame(data)
         
+        # AND every condition into one mask so the frame is copied only once
+        mask = pd.Series(True, index=df.index)
         if channel_filter:
-            df = df[df['channel_username'] == channel_filter]
+            mask &= df['channel_username'] == channel_filter
         if keyword_filter:
-            df = df[df['keyword_matched'] == keyword_filter]
-        if date_from:
-            df = df[pd.to_datetime(df['detected_at']) >= date_from]
-        if date_to:
-            df = df[pd.to_datetime(df['detected_at']) <= date_to]
+            mask &= df['keyword_matched'] == keyword_filter
+        if date_from or date_to:
+            # Parse the timestamp column once for both bounds
+            detected_at = pd.to_datetime(df['detected_at'], cache=True)
+            if date_from:
+                mask &= detected_at >= date_from
+            if date_to:
+                mask &= detected_at <= date_to
+        df = df[mask]
         
         filtered_data = df.to_dict('records')
         
@@ -1,4 +1,5 @@
 import asyncio
+import sys
 import nest_asyncio
 from pyrogram import Client
 from pyrogram.types import ChatType
@@ -12,14 +13,20 @@ session_name = "my_account"  # ← Session name you want to use
 
 app = Client("my_account", api_id=api_id, api_hash=api_hash)
 
+# Dialog types that are listed
+_INTERESTING = frozenset({ChatType.CHANNEL, ChatType.SUPERGROUP})
+
 async def main():
     await app.start()
 
-    print("📢 Channels you are subscribed to:\n")
+    out = sys.stdout
+    out.write("📢 Channels you are subscribed to:\n\n")
 
     async for dialog in app.get_dialogs():
-        if dialog.chat.type in [ChatType.CHANNEL, ChatType.SUPERGROUP]:
-            print(f"📣 {dialog.chat.title} - @{dialog.chat.username}")
+        if dialog.chat.type in _INTERESTING:
+            out.write(f"📣 {dialog.chat.title} - @{dialog.chat.username}\n")
+
+    out.flush()
 
     await app.stop()
 
@@ -3,8 +3,13 @@ Logging system for the project
 Provides colored console logging and file logging
 """
 import logging
+import os
 import sys
+import threading
+import time
+import weakref
 from datetime import datetime
+from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
 try:
@@ -16,6 +21,111 @@ except ImportError:
 from config import config
 
 
+class BufferedRotatingFileHandler(RotatingFileHandler):
+    """Rotating log file that batches writes instead of flushing every record
+    
+    A background thread flushes every open handler each FLUSH_INTERVAL
+    seconds, so buffered lines reach the file even when logging goes quiet;
+    WARNING and above are flushed right away, and closing the handler
+    (logging.shutdown at exit) flushes whatever is left. The size check for
+    rotation uses a running byte count, since seeking the stream (what
+    RotatingFileHandler does) would flush the buffer on every record.
+    """
+    
+    MAX_BYTES = 10 * 1024 * 1024
+    BACKUP_COUNT = 5
+    BUFFER_SIZE = 64 * 1024
+    FLUSH_INTERVAL = 0.5
+    
+    _instances = weakref.WeakSet()  # Handlers the flusher thread visits
+    _flusher: threading.Thread = None
+    _flusher_lock = threading.Lock()
+    
+    def __init__(self, filename, encoding: str = 'utf-8'):
+        super().__init__(
+            filename,
+            maxBytes=self.MAX_BYTES,
+            backupCount=self.BACKUP_COUNT,
+            encoding=encoding,
+            delay=True
+        )
+        self._last_flush = 0.0
+        self._size = 0  # Bytes in the current file, buffered ones included
+        self._pending = 0  # Size of the record being emitted
+        self._instances.add(self)
+        self._start_flusher()
+    
+    @classmethod
+    def _start_flusher(cls):
+        """Start the shared flusher thread once per process"""
+        with cls._flusher_lock:
+            if cls._flusher is None:
+                cls._flusher = threading.Thread(target=cls._flush_loop, name='log-flusher', daemon=True)
+                cls._flusher.start()
+    
+    @classmethod
+    def _flush_loop(cls):
+        while True:
+            time.sleep(cls.FLUSH_INTERVAL)
+            for handler in list(cls._instances):
+                handler._flush_now()
+    
+    def _open(self):
+        stream = open(self.baseFilename, self.mode, encoding=self.encoding,
+                      errors=self.errors, buffering=self.BUFFER_SIZE)
+        self._size = os.fstat(stream.fileno()).st_size
+        return stream
+    
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        """Roll over when the record would push the byte count past MAX_BYTES"""
+        if self.stream is None:
+            self.stream = self._open()
+        line = self.format(record) + self.terminator
+        self._pending = len(line.encode(self.encoding or 'utf-8', errors='replace'))
+        return self.maxBytes > 0 and self._size + self._pending >= self.maxBytes
+    
+    def _flush_now(self):
+        super().flush()
+        self._last_flush = time.monotonic()
+    
+    def flush(self):
+        """Flush only when FLUSH_INTERVAL has passed since the last flush"""
+        if time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL:
+            self._flush_now()
+    
+    def emit(self, record: logging.LogRecord):
+        super().emit(record)
+        self._size += self._pending
+        if record.levelno >= logging.WARNING:
+            self._flush_now()
+    
+    def close(self):
+        self._instances.discard(self)
+        super().close()
+
+
+# Message format
+LOG_FORMAT = '%(asctime)s | %(levelname)-8s | %(name)s | %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# One file handler shared by every logger - separate handlers on the same
+# file would each rotate it on their own and interleave their buffers
+_file_handler: BufferedRotatingFileHandler = None
+_file_handler_lock = threading.Lock()
+
+
+def _get_file_handler() -> BufferedRotatingFileHandler:
+    """The log file handler, created on first use"""
+    global _file_handler
+    with _file_handler_lock:
+        if _file_handler is None:
+            config.ensure_directories()
+            handler = BufferedRotatingFileHandler(config.LOG_FILE, encoding='utf-8')
+            handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT))
+            _file_handler = handler
+    return _file_handler
+
+
 def setup_logger(name: str = 'channel_monitor', level: int = logging.INFO) -> logging.Logger:
     """
     Setup and return a configured logger
@@ -35,10 +145,6 @@ def setup_logger(name: str = 'channel_monitor', level: int = logging.INFO) -> lo
     
     logger.setLevel(level)
     
-    # Message format
-    log_format = '%(asctime)s | %(levelname)-8s | %(name)s | %(message)s'
-    date_format = '%Y-%m-%d %H:%M:%S'
-    
     # Console Handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(level)
@@ -47,7 +153,7 @@ def setup_logger(name: str = 'channel_monitor', level: int = logging.INFO) -> lo
         color_format = '%(log_color)s%(asctime)s | %(levelname)-8s | %(name)s | %(message)s%(reset)s'
         console_formatter = colorlog.ColoredFormatter(
             color_format,
-            datefmt=date_format,
+            datefmt=DATE_FORMAT,
             log_colors={
                 'DEBUG': 'cyan',
                 'INFO': 'green',
@@ -57,22 +163,18 @@ def setup_logger(name: str = 'channel_monitor', level: int = logging.INFO) -> lo
             }
         )
     else:
-        console_formatter = logging.Formatter(log_format, datefmt=date_format)
+        console_formatter = logging.Formatter(LOG_FORMAT, datefmt=DATE_FORMAT)
     
     console_handler.setFormatter(console_formatter)
     logger.addHandler(console_handler)
     
-    # File Handlerls
+    # File Handler
+    if not config.LOG_TO_FILE:
+        return logger
+    
     try:
-        config.ensure_directories()
-        file_handler = logging.FileHandler(
-            config.LOG_FILE,
-            encoding='utf-8'
-        )
-        file_handler.setLevel(level)
-        file_formatter = logging.Formatter(log_format, datefmt=date_format)
-        file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
+        # The logger's own level filters records before they reach it
+        logger.addHandler(_get_file_handler())
     except Exception as e:
         logger.warning(f"Failed to create log file: {e}")
     
@@ -84,46 +186,56 @@ logger = setup_logger()
 
 
 class MonitorLogger:
-    """Helper class for logging monitoring events"""
+    """Helper class for logging monitoring events
+    
+    Messages use the logger's %-style arguments so they are only formatted
+    when the level is enabled; stacklevel=2 reports the caller's line.
+    """
     
     def __init__(self, name: str = 'channel_monitor'):
         self.logger = setup_logger(name)
     
     def keyword_found(self, keyword: str, channel: str, message_id: int):
         """Log keyword found event"""
-        self.logger.info(f"🔍 Keyword '{keyword}' found in channel @{channel} (Message ID: {message_id})")
+        self.logger.info(
+            "🔍 Keyword '%s' found in channel @%s (Message ID: %s)",
+            keyword, channel, message_id, stacklevel=2
+        )
     
     def notification_sent(self, method: str, destination: str):
         """Log notification sent event"""
-        self.logger.info(f"✅ {method} notification sent to {destination}")
+        self.logger.info("✅ %s notification sent to %s", method, destination, stacklevel=2)
     
     def notification_failed(self, method: str, error: str):
         """Log notification failure"""
-        self.logger.error(f"❌ {method} notification failed: {error}")
+        self.logger.error("❌ %s notification failed: %s", method, error, stacklevel=2)
     
     def monitor_started(self, channels_count: int, keywords_count: int):
         """Log monitoring start"""
-        self.logger.info(f"🚀 Monitoring started: {channels_count} channels, {keywords_count} keywords")
+        self.logger.info(
+            "🚀 Monitoring started: %d channels, %d keywords",
+            channels_count, keywords_count, stacklevel=2
+        )
     
     def monitor_stopped(self):
         """Log monitoring stop"""
-        self.logger.info("🛑 Monitoring stopped")
+        self.logger.info("🛑 Monitoring stopped", stacklevel=2)
     
-    def error(self, message: str, exc_info: bool = False):
-        """Log error"""
-        self.logger.error(message, exc_info=exc_info)
+    def error(self, message: str, *args, exc_info: bool = False):
+        """Log error (args are %-formatted into message only if it is emitted)"""
+        self.logger.error(message, *args, exc_info=exc_info, stacklevel=2)
     
-    def warning(self, message: str):
+    def warning(self, message: str, *args):
         """Log warning"""
-        self.logger.warning(message)
+        self.logger.warning(message, *args, stacklevel=2)
     
-    def info(self, message: str):
+    def info(self, message: str, *args):
         """Log info"""
-        self.logger.info(message)
+        self.logger.info(message, *args, stacklevel=2)
     
-    def debug(self, message: str):
+    def debug(self, message: str, *args):
         """Log debug"""
-        self.logger.debug(message)
+        self.logger.debug(message, *args, stacklevel=2)
 
 
 # Default instance
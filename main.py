@@ -3,7 +3,6 @@ Main entry point for the project
 Run the monitoring system or dashboard
 """
 import argparse
-import asyncio
 import sys
 from pathlib import Path
 
@@ -11,6 +10,16 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 
+def run_async(coro):
+    """Run a coroutine to completion, on uvloop when it is installed"""
+    try:
+        import uvloop
+    except ImportError:
+        import asyncio
+        return asyncio.run(coro)
+    return uvloop.run(coro)
+
+
 def run_monitor():
     """Run the monitoring system"""
     from monitor import run_monitor as start_monitor
@@ -24,15 +33,20 @@ def run_dashboard():
 
 
 def run_both():
-    """Run both together"""
+    """Run both together on one event loop"""
+    import asyncio
     import threading
+    from dashboard.app import run_dashboard as start_dashboard
+    from monitor import run_monitor as start_monitor
     
-    # Run Dashboard in a separate thread
-    dashboard_thread = threading.Thread(target=run_dashboard, daemon=True)
-    dashboard_thread.start()
+    def start_dashboard_thread():
+        # Called on the monitor's loop once the database is connected - the
+        # WSGI server gets its own thread, its database work runs on this loop
+        loop = asyncio.get_running_loop()
+        threading.Thread(target=start_dashboard, args=(loop,), name='dashboard', daemon=True).start()
     
     # Run Monitor in the main thread
-    run_monitor()
+    start_monitor(on_ready=start_dashboard_thread)
 
 
 def generate_session():
@@ -56,30 +70,31 @@ def generate_session():
 
 def list_channels():
     """Display subscribed channels"""
-    import asyncio
     from pyrogram import Client
     from pyrogram.enums import ChatType
     from config import config
     
+    # Dialog types that are listed
+    interesting = frozenset({ChatType.CHANNEL, ChatType.SUPERGROUP})
+    
     async def _list():
         async with Client(config.SESSION_NAME, config.API_ID, config.API_HASH) as app:
             print("\n📢 Subscribed channels:\n")
             print("-" * 50)
             
             async for dialog in app.get_dialogs():
-                if dialog.chat.type in [ChatType.CHANNEL, ChatType.SUPERGROUP]:
+                if dialog.chat.type in interesting:
                     username = f"@{dialog.chat.username}" if dialog.chat.username else "no username"
                     print(f"📣 {dialog.chat.title}")
                     print(f"   {username}")
                     print(f"   ID: {dialog.chat.id}")
                     print("-" * 50)
     
-    asyncio.run(_list())
+    run_async(_list())
 
 
 def init_database():
     """Initialize the database"""
-    import asyncio
     from database import db
     from config import config
     
@@ -88,18 +103,18 @@ def init_database():
         print(f"✅ Database created: {config.DATABASE_PATH}")
         await db.disconnect()
     
-    asyncio.run(_init())
+    run_async(_init())
 
 
 def export_data(format: str = 'csv'):
     """Export data"""
-    import asyncio
     from database import db
     from exporter import DataExporter
     
     async def _export():
         await db.connect()
-        messages = await db.get_detected_messages(limit=10000)
+        # Stream rows straight from the database into the export file
+        messages = db.iter_detected_messages(limit=10000)
         
         exporter = DataExporter()
         
@@ -115,7 +130,7 @@ def export_data(format: str = 'csv'):
         else:
             print("❌ No data to export")
     
-    asyncio.run(_export())
+    run_async(_export())
 
 
 def main():
@@ -5,32 +5,75 @@ Monitors specified channels and searches for keywords
 with database support, multiple notifications, and advanced search
 """
 import asyncio
+import sqlite3
 import sys
-from typing import List, Set
+from typing import Callable, FrozenSet, List, Optional, Set
 
 from pyrogram import Client, filters
+from pyrogram.storage import FileStorage
 from pyrogram.types import Message
 
-from config import config, Config
+from config import config
 from database import db
 from logger import monitor_logger, MonitorLogger
 from notifications import notification_manager, NotificationMessage
 from search_engine import SearchEngine, MatchType, parse_keyword_string
 from scheduler import auto_restart, graceful_shutdown, schedule_manager
 from bot import setup_bot
+from pyrogram_patches import disable_sticker_set_lookup
+
+# libuv-based event loop (optional - not available on Windows)
+try:
+    import uvloop
+    HAS_UVLOOP = True
+except ImportError:
+    HAS_UVLOOP = False
+
+
+class SessionStorage(FileStorage):
+    """Pyrogram session file without journaling, fsyncs or VACUUM on open"""
+    
+    async def open(self):
+        path = self.database
+        file_exists = path.is_file()
+        
+        self.conn = sqlite3.connect(str(path), timeout=1, check_same_thread=False)
+        # Losing the session on a crash only means logging in again
+        self.conn.execute("PRAGMA journal_mode=OFF")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        
+        if not file_exists:
+            self.conn.execute("PRAGMA auto_vacuum=NONE")
+            self.create()
+        else:
+            self.update()
 
 
 class ChannelMonitor:
     """Main channel monitoring system"""
     
+    # Detected messages are written in batches of up to this many rows...
+    DETECTION_BATCH_SIZE = 100
+    # ...or after this many seconds, whichever comes first
+    DETECTION_FLUSH_DELAY = 0.25
+    # Unsaved detections kept for retrying while the database fails
+    MAX_PENDING_DETECTIONS = 10000
+    # Longest message text saved with a detection
+    MAX_STORED_TEXT = 2000
+    
     def __init__(self):
         self.client: Client = None
         self.search_engine = SearchEngine()
+        self._has_patterns = False  # Any active keywords (set by _load_keywords)
         self.monitored_channels: Set[str] = set()
+        self._monitored_lookup: FrozenSet[str] = frozenset()  # Ids and bare usernames
         self.is_running = False
         self.logger = MonitorLogger('monitor')
         self._reload_task = None
         self._reload_interval = 30  # Reload config every 30 seconds
+        self._pending_detections: List[tuple] = []
+        self._batch_full = asyncio.Event()
+        self._flush_task = None
     
     async def initialize(self):
         """Initialize the system"""
@@ -42,32 +85,40 @@ class ChannelMonitor:
                 os.remove(session_journal)
                 self.logger.info("Removed stale session journal file")
             except Exception as e:
-                self.logger.warning(f"Could not remove session journal: {e}")
+                self.logger.warning("Could not remove session journal: %s", e)
         
         # Validate configuration
-        errors = Config.validate()
+        errors = config.validate()
         if errors:
             for error in errors:
-                self.logger.error(f"Configuration error: {error}")
+                self.logger.error("Configuration error: %s", error)
             raise ValueError("Incomplete configuration - check .env file")
         
         # Create directories
-        Config.ensure_directories()
+        config.ensure_directories()
+        
+        # Report which MTProto crypto backend Pyrogram will use
+        try:
+            import tgcrypto  # noqa: F401
+            self.logger.info("Using TgCrypto for MTProto encryption")
+        except ImportError:
+            self.logger.warning("TgCrypto not installed - using slow pure Python encryption")
         
         # Connect to database
         await db.connect()
         self.logger.info("Connected to database")
         
         # Load keywords and channels from database
-        await self._load_keywords()
-        await self._load_channels()
+        await asyncio.gather(self._load_keywords(), self._load_channels())
         
         # Create Telegram client
+        disable_sticker_set_lookup()
         self.client = Client(
             config.SESSION_NAME,
             api_id=config.API_ID,
             api_hash=config.API_HASH
         )
+        self.client.storage = SessionStorage(self.client.name, self.client.workdir)
         
         # Setup message handler
         self._setup_handlers()
@@ -91,8 +142,9 @@ class ChannelMonitor:
                 self.search_engine.add_regex(kw['keyword'])
             else:
                 self.search_engine.add_keyword(kw['keyword'])
+        self._has_patterns = bool(self.search_engine.patterns)
         
-        self.logger.info(f"Loaded {len(keywords)} keywords")
+        self.logger.info("Loaded %d keywords", len(keywords))
     
     async def _load_channels(self):
         """Load channels from database"""
@@ -105,7 +157,12 @@ class ChannelMonitor:
                 self.monitored_channels.add(ch['username'])
             self.monitored_channels.add(ch['channel_id'])
         
-        self.logger.info(f"Loaded {len(channels)} channels for monitoring")
+        # Store usernames without '@' so a message needs one probe per field
+        self._monitored_lookup = frozenset(
+            value.lstrip('@') for value in self.monitored_channels
+        ) - {''}
+        
+        self.logger.info("Loaded %d channels for monitoring", len(channels))
     
     def _setup_handlers(self):
         """Setup message handlers"""
@@ -115,6 +172,10 @@ class ChannelMonitor:
     
     async def _process_message(self, message: Message):
         """Process incoming message"""
+        # Nothing to match against - skip the channel check and text extraction too
+        if not self._has_patterns:
+            return
+        
         try:
             # Check channel
             chat = message.chat
@@ -136,65 +197,127 @@ class ChannelMonitor:
             if not matches:
                 return
             
-            # Process each match
-            for match in matches:
-                await self._handle_match(message, match.pattern, text)
+            # Per-message values, shared by every match
+            message_id = message.id
+            display_name = channel_username or chat.title or ""
+            message_link = f"https://t.me/{display_name}/{message_id}" if display_name else None
+            stored_text = text[:self.MAX_STORED_TEXT]  # No copy when the text is shorter
+            
+            # Process each match - several keywords notify concurrently
+            if len(matches) == 1:
+                await self._handle_match(
+                    message_id, channel_id, display_name, matches[0].pattern,
+                    text, stored_text, message_link
+                )
+            else:
+                await asyncio.gather(*(
+                    self._handle_match(
+                        message_id, channel_id, display_name, match.pattern,
+                        text, stored_text, message_link
+                    )
+                    for match in matches
+                ))
         
         except Exception as e:
-            self.logger.error(f"Error processing message: {e}", exc_info=True)
+            self.logger.error("Error processing message: %s", e, exc_info=True)
     
     def _is_monitored_channel(self, channel_id: str, username: str) -> bool:
         """Check if channel is monitored"""
-        if channel_id in self.monitored_channels:
-            return True
-        if username and username in self.monitored_channels:
-            return True
-        if username and f"@{username}" in self.monitored_channels:
-            return True
-        return False
+        # '' is never in the lookup, so messages without a username miss
+        lookup = self._monitored_lookup
+        return channel_id in lookup or username in lookup
     
-    async def _handle_match(self, message: Message, keyword: str, text: str):
-        """Handle match"""
-        channel_id = str(message.chat.id)
-        channel_username = message.chat.username or message.chat.title or ""
-        message_id = message.id
-        
-        # Check for duplicates
-        if await db.is_message_detected(message_id, channel_id, keyword):
+    async def _handle_match(
+        self,
+        message_id: int,
+        channel_id: str,
+        channel_username: str,
+        keyword: str,
+        text: str,
+        stored_text: str,
+        message_link: Optional[str]
+    ):
+        """Handle match (everything but the keyword is computed once per message)"""
+        # Check for duplicates and claim the message in the same step
+        if not await db.claim_detected(message_id, channel_id, keyword):
             return
         
-        # Create message link
-        message_link = f"https://t.me/{channel_username}/{message_id}" if channel_username else None
-        
-        # Save to database
-        db_id = await db.add_detected_message(
-            message_id=message_id,
-            channel_id=channel_id,
-            channel_username=channel_username,
-            keyword_matched=keyword,
-            message_text=text[:2000],
-            message_link=message_link
-        )
-        
         # Log
         self.logger.keyword_found(keyword, channel_username, message_id)
         
         # Send notifications
-        await notification_manager.notify_keyword_found(
-            keyword=keyword,
-            channel=channel_username,
-            message_text=text,
-            message_link=message_link
-        )
+        notification_sent = True
+        try:
+            await notification_manager.notify_keyword_found(
+                keyword=keyword,
+                channel=channel_username,
+                message_text=text,
+                message_link=message_link
+            )
+        except Exception as e:
+            notification_sent = False
+            self.logger.error("Error sending notification: %s", e)
+        
+        # Save to database (with the notification status, so no follow-up UPDATE)
+        self._queue_detection((
+            message_id, channel_id, channel_username, keyword,
+            stored_text, message_link, notification_sent
+        ))
+    
+    def _queue_detection(self, row: tuple):
+        """Buffer a detected message for the next batched insert"""
+        self._pending_detections.append(row)
+        
+        if len(self._pending_detections) >= self.DETECTION_BATCH_SIZE:
+            self._batch_full.set()
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_detections_soon())
+    
+    async def _flush_detections_soon(self):
+        """Flush the buffer whenever it fills up or the flush delay passes"""
+        # stop() does the final flush itself
+        while self._pending_detections and self.is_running:
+            try:
+                await asyncio.wait_for(self._batch_full.wait(), self.DETECTION_FLUSH_DELAY)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_full.clear()
+            await self._flush_detections()
+    
+    async def _flush_detections(self):
+        """Write all buffered detections in one transaction"""
+        rows, self._pending_detections = self._pending_detections, []
+        if not rows:
+            return
         
-        # Update notification status
-        if db_id:
-            await db.mark_notification_sent(db_id)
+        saved = 0
+        try:
+            saved = await db.add_detected_messages_batch(rows)
+        finally:
+            if not saved:
+                # Not written (e.g. database locked) - retry with the next flush, oldest first
+                self._pending_detections[:0] = rows
+                overflow = len(self._pending_detections) - self.MAX_PENDING_DETECTIONS
+                if overflow > 0:
+                    self._drop_detections(self._pending_detections[:overflow])
+                    del self._pending_detections[:overflow]
+    
+    def _drop_detections(self, rows: List[tuple]):
+        """Give up on detections that could not be saved
+        
+        Their duplicate claims are released (a redelivered message is handled
+        again) and each one is logged, as its notification already went out.
+        """
+        for message_id, channel_id, channel_username, keyword, _, message_link, _ in rows:
+            db.forget_detected(message_id, channel_id, keyword)
+            self.logger.error(
+                "Detection not saved: '%s' in @%s (Message ID: %s) %s",
+                keyword, channel_username, message_id, message_link or ''
+            )
     
     async def reload_config(self):
         """Reload configuration"""
-        await self._load_keywords()
-        await self._load_channels()
+        await asyncio.gather(self._load_keywords(), self._load_channels())
         self.logger.info("Configuration reloaded")
     
     async def _auto_reload_config(self):
@@ -207,7 +330,7 @@ class ChannelMonitor:
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                self.logger.error(f"Error in auto-reload: {e}")
+                self.logger.error("Error in auto-reload: %s", e)
     
     async def start(self):
         """Start monitoring"""
@@ -224,7 +347,7 @@ class ChannelMonitor:
         
         # Display account information
         me = await self.client.get_me()
-        self.logger.info(f"Logged in as: {me.first_name} (@{me.username})")
+        self.logger.info("Logged in as: %s (@%s)", me.first_name, me.username)
         
         # Start auto-reload task
         self._reload_task = asyncio.create_task(self._auto_reload_config())
@@ -250,34 +373,48 @@ class ChannelMonitor:
             except asyncio.CancelledError:
                 pass
         
+        # Write out detections still waiting for a batch
+        try:
+            if self._flush_task and not self._flush_task.done():
+                self._batch_full.set()
+                await self._flush_task
+            await self._flush_detections()
+        except Exception as e:
+            self.logger.error("Error saving pending detections: %s", e)
+        if self._pending_detections:
+            self._drop_detections(self._pending_detections)
+            self._pending_detections = []
+        
         # Close client with error handling
         try:
             if self.client and self.client.is_connected:
                 await self.client.stop()
         except Exception as e:
-            self.logger.error(f"Error stopping client: {e}")
+            self.logger.error("Error stopping client: %s", e)
         
         # Close database connection
         try:
             await db.disconnect()
         except Exception as e:
-            self.logger.error(f"Error closing database: {e}")
+            self.logger.error("Error closing database: %s", e)
     
-    async def run(self):
-        """Full run"""
+    async def run(self, on_ready: Callable[[], None] = None):
+        """Full run (on_ready is called once the database is connected)"""
         try:
             await self.initialize()
+            if on_ready:
+                on_ready()
             await self.start()
         except KeyboardInterrupt:
             pass
         except Exception as e:
-            self.logger.error(f"Error: {e}", exc_info=True)
+            self.logger.error("Error: %s", e, exc_info=True)
             raise
         finally:
             await self.stop()
 
 
-async def main():
+async def main(on_ready: Callable[[], None] = None):
     """Main function"""
     import logging
     
@@ -305,20 +442,25 @@ async def main():
         
         # Log other exceptions
         if exception:
-            monitor_logger.error(f"Unhandled exception in task: {exception}")
+            monitor_logger.error("Unhandled exception in task: %s", exception)
         else:
-            monitor_logger.error(f"Unhandled error: {message}")
+            monitor_logger.error("Unhandled error: %s", message)
     
     loop.set_exception_handler(exception_handler)
     
+    # Python 3.12+: tasks run synchronously until their first real await, so
+    # updates that return early never get scheduled on the loop at all
+    if hasattr(asyncio, 'eager_task_factory'):
+        loop.set_task_factory(asyncio.eager_task_factory)
+    
     monitor = ChannelMonitor()
     
     # Run the monitor (idle() handles signals internally)
-    await monitor.run()
+    await monitor.run(on_ready)
 
 
-def run_monitor():
-    """Entry point"""
+def run_monitor(on_ready: Callable[[], None] = None):
+    """Entry point (on_ready is called on the event loop once the database is connected)"""
     print("""
     ╔══════════════════════════════════════════════════════════╗
     ║              📡 Telegram Channel Monitor                 ║
@@ -327,7 +469,10 @@ def run_monitor():
     """)
     
     try:
-        asyncio.run(main())
+        if HAS_UVLOOP:
+            uvloop.run(main(on_ready))
+        else:
+            asyncio.run(main(on_ready))
     except KeyboardInterrupt:
         print("\n👋 Goodbye!")
 
@@ -0,0 +1,16 @@
+"""
+Pyrogram patches
+Small behavior tweaks shared by the monitor and the standalone script
+"""
+from pyrogram.types import Sticker
+
+
+async def _skip_sticker_set_name(invoke, input_sticker_set_id):
+    """Stand-in for Sticker._get_sticker_set_name that makes no request"""
+    return None
+
+
+def disable_sticker_set_lookup():
+    """Stop Pyrogram from calling GetStickerSet for every parsed sticker"""
+    # The monitors never read Sticker.set_name
+    Sticker._get_sticker_set_name = staticmethod(_skip_sticker_set_name)
@@ -3,12 +3,19 @@ Advanced Search Engine
 Supports regular search and regex patterns
 """
 import re
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
 
 from logger import monitor_logger
 
+# Optional C multi-pattern matcher (pip install pyahocorasick)
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
 
 class MatchType(Enum):
     """Match type"""
@@ -57,6 +64,10 @@ class SearchEngine:
     
     def __init__(self):
         self.patterns: List[SearchPattern] = []
+        # Aho-Corasick automata for the CONTAINS keywords as (case_sensitive, automaton),
+        # rebuilt on the next search after the patterns change
+        self._automata: Optional[List[Tuple[bool, 'ahocorasick.Automaton']]] = None
+        self._automaton_indices = frozenset()  # Patterns the automata cover
     
     def add_pattern(
         self, 
@@ -71,6 +82,7 @@ class SearchEngine:
             case_sensitive=case_sensitive
         )
         self.patterns.append(search_pattern)
+        self._automata = None
         monitor_logger.debug(f"Pattern added: {pattern} ({match_type.value})")
     
     def add_regex(self, pattern: str, case_sensitive: bool = False):
@@ -84,6 +96,30 @@ class SearchEngine:
     def clear_patterns(self):
         """Clear all patterns"""
         self.patterns.clear()
+        self._automata = None
+        self._automaton_indices = frozenset()
+    
+    def _build_automata(self):
+        """Put every CONTAINS keyword into one automaton per case mode"""
+        words: Dict[bool, Dict[str, List[int]]] = {False: {}, True: {}}
+        for index, pattern in enumerate(self.patterns):
+            if pattern.match_type == MatchType.CONTAINS and pattern.pattern:
+                word = pattern.pattern if pattern.case_sensitive else pattern.pattern.lower()
+                words[pattern.case_sensitive].setdefault(word, []).append(index)
+        
+        self._automata = []
+        for case_sensitive, table in words.items():
+            if not table:
+                continue
+            automaton = ahocorasick.Automaton()
+            for word, indices in table.items():
+                automaton.add_word(word, (len(word), indices))
+            automaton.make_automaton()
+            self._automata.append((case_sensitive, automaton))
+        
+        self._automaton_indices = frozenset(
+            index for table in words.values() for indices in table.values() for index in indices
+        )
     
     def search(self, text: str) -> List[MatchResult]:
         """
@@ -95,14 +131,37 @@ class SearchEngine:
         if not text:
             return []
         
-        results = []
+        if HAS_AHOCORASICK and self._automata is None:
+            self._build_automata()
+        
+        lower_text = text.lower()
+        found: Dict[int, MatchResult] = {}
+        
+        # All plain keywords in one pass over the text (first occurrence of each)
+        for case_sensitive, automaton in self._automata or ():
+            for end, (length, indices) in automaton.iter(text if case_sensitive else lower_text):
+                start = end - length + 1
+                for index in indices:
+                    if index not in found:
+                        pattern = self.patterns[index].pattern
+                        found[index] = MatchResult(
+                            matched=True,
+                            pattern=pattern,
+                            match_type=MatchType.CONTAINS,
+                            matched_text=text[start:start + len(pattern)],
+                            position=(start, start + len(pattern))
+                        )
         
-        for pattern in self.patterns:
-            result = self._match_pattern(text, pattern)
+        # Regex and the other match types one by one
+        for index, pattern in enumerate(self.patterns):
+            if index in self._automaton_indices:
+                continue
+            result = self._match_pattern(text, pattern, lower_text)
             if result.matched:
-                results.append(result)
+                found[index] = result
         
-        return results
+        # Same order as the patterns were added
+        return [found[index] for index in sorted(found)]
     
     def search_first(self, text: str) -> Optional[MatchResult]:
         """Search for first match only"""
@@ -113,9 +172,12 @@ class SearchEngine:
         """Check if any match exists"""
         return bool(self.search_first(text))
     
-    def _match_pattern(self, text: str, pattern: SearchPattern) -> MatchResult:
-        """Apply pattern to text"""
-        search_text = text if pattern.case_sensitive else text.lower()
+    def _match_pattern(self, text: str, pattern: SearchPattern, lower_text: str = None) -> MatchResult:
+        """Apply pattern to text (lower_text: text.lower(), if already computed)"""
+        if pattern.case_sensitive:
+            search_text = text
+        else:
+            search_text = lower_text if lower_text is not None else text.lower()
         search_pattern = pattern.pattern if pattern.case_sensitive else pattern.pattern.lower()
         
         matched = False
@@ -0,0 +1,79 @@
+"""
+Tests for the data export system
+"""
+import sys
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from xml.etree import ElementTree
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import exporter
+from exporter import AdvancedExporter
+
+_NS = {'x': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+
+
+def read_xlsx_cells(filepath: Path) -> dict:
+    """Read every cell of the first sheet as {'A1': value} (numbers as float)"""
+    with zipfile.ZipFile(filepath) as archive:
+        shared = []
+        if 'xl/sharedStrings.xml' in archive.namelist():
+            root = ElementTree.fromstring(archive.read('xl/sharedStrings.xml'))
+            shared = [''.join(t.text or '' for t in si.iter(f"{{{_NS['x']}}}t"))
+                      for si in root.findall('x:si', _NS)]
+        sheet = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+    
+    cells = {}
+    for cell in sheet.iter(f"{{{_NS['x']}}}c"):
+        kind = cell.get('t')
+        if kind == 'inlineStr':
+            value = ''.join(t.text or '' for t in cell.iter(f"{{{_NS['x']}}}t"))
+        elif kind == 's':
+            value = shared[int(cell.find('x:v', _NS).text)]
+        elif kind == 'str':
+            value = cell.find('x:v', _NS).text
+        else:
+            v = cell.find('x:v', _NS)
+            if v is None:
+                continue
+            value = float(v.text)
+        cells[cell.get('r')] = value
+    return cells
+
+
+@unittest.skipUnless(exporter.HAS_XLSXWRITER, "xlsxwriter not installed")
+class ExcelExportTest(unittest.TestCase):
+    """Excel export round trip"""
+    
+    def test_every_cell_round_trips(self):
+        rows = [
+            {'id': i, 'channel_username': f'chan{i}', 'message_text': f'text {i}',
+             'message_link': f'https://t.me/chan{i}/{i}'}
+            for i in range(1, 6)
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            filepath = AdvancedExporter(Path(tmp)).export_to_excel_sync(rows, Path(tmp) / 'out.xlsx')
+            self.assertIsNotNone(filepath)
+            cells = read_xlsx_cells(filepath)
+        
+        columns = list(rows[0])
+        expected = {f'{chr(65 + c)}1': name for c, name in enumerate(columns)}
+        for r, row in enumerate(rows, 2):
+            for c, name in enumerate(columns):
+                value = row[name]
+                expected[f'{chr(65 + c)}{r}'] = float(value) if isinstance(value, int) else value
+        self.assertEqual(cells, expected)
+    
+    def test_missing_keys_leave_cells_blank(self):
+        rows = [{'a': 'x'}, {'b': 'y'}]
+        with tempfile.TemporaryDirectory() as tmp:
+            filepath = AdvancedExporter(Path(tmp)).export_to_excel_sync(rows, Path(tmp) / 'out.xlsx')
+            cells = read_xlsx_cells(filepath)
+        self.assertEqual(cells, {'A1': 'a', 'B1': 'b', 'A2': 'x', 'B3': 'y'})
+
+
+if __name__ == '__main__':
+    unittest.main()
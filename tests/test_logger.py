@@ -0,0 +1,75 @@
+"""
+Tests for the logging system
+"""
+import logging
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from logger import BufferedRotatingFileHandler
+
+
+class QuietHandler(BufferedRotatingFileHandler):
+    """Handler that only flushes when asked (no interval flush during a test)"""
+    
+    FLUSH_INTERVAL = 3600
+    
+    def __init__(self, filename):
+        super().__init__(filename)
+        self._instances.discard(self)
+
+
+def make_record(message: str, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord('test', level, __file__, 0, message, None, None)
+
+
+class BufferedRotatingFileHandlerTest(unittest.TestCase):
+    """Buffered log file writes"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'test.log'
+        self.handler = QuietHandler(self.path)
+    
+    def tearDown(self):
+        self.handler.close()
+        self.tmp.cleanup()
+    
+    def test_file_does_not_grow_before_flush(self):
+        self.handler.emit(make_record('first'))  # The very first record flushes
+        size = self.path.stat().st_size
+        
+        for i in range(5):
+            self.handler.emit(make_record(f'line {i}'))
+            self.assertEqual(self.path.stat().st_size, size)
+        
+        self.handler.flush()  # Still within FLUSH_INTERVAL
+        self.assertEqual(self.path.stat().st_size, size)
+        
+        self.handler._flush_now()
+        self.assertEqual(self.path.read_text().splitlines(), ['first'] + [f'line {i}' for i in range(5)])
+    
+    def test_warning_flushes_at_once(self):
+        self.handler.emit(make_record('first'))
+        self.handler.emit(make_record('buffered'))
+        self.handler.emit(make_record('problem', logging.WARNING))
+        self.assertEqual(self.path.read_text().splitlines(), ['first', 'buffered', 'problem'])
+    
+    def test_rolls_over_by_byte_count(self):
+        self.handler.maxBytes = 100
+        for i in range(30):
+            self.handler.emit(make_record(f'line {i:02d}'))  # 8 bytes each
+        self.handler._flush_now()
+        
+        backup = Path(f'{self.path}.1')
+        self.assertTrue(backup.exists())
+        self.assertLess(backup.stat().st_size, 100)
+        self.assertLess(self.path.stat().st_size, 100)
+        self.assertEqual(self.path.read_text().splitlines()[-1], 'line 29')
+
+
+if __name__ == '__main__':
+    unittest.main()